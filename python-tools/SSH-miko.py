@@ -1,19 +1,316 @@
-import subprocess
+#!/usr/bin/env python3
+"""
+Parallel SSH command runner built on paramiko.
+
+Fans one or more commands out to every host in an inventory file. Each host
+gets a single authenticated transport that is reused for all of its commands,
+output is streamed line by line with a per-host prefix, and a summary of exit
+codes and failures is printed once every host has finished.
+
+Inventory format, one host per line ('#' starts a comment):
+
+    web01
+    admin@10.0.0.5
+    deploy@10.0.0.6:2222
+    fe80::1
+    admin@[2001:db8::5]:2222
+
+Example:
+    python3 SSH-miko.py -i hosts.txt -u admin -P -c "uptime" -c "df -h /"
+"""
+
+import argparse
+import getpass
+import os
+import select
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import paramiko
 
 
-def ssh_command(ip, user, passwd, command):
+class HostResult:
+    """Outcome of running the command list on a single inventory entry."""
+
+    def __init__(self, user, host, port):
+        self.user = user
+        self.host = host
+        self.port = port
+        self.exit_codes = []  # one entry per command, None if it timed out
+        self.stdout = []
+        self.stderr = []
+        self.error = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None and all(code == 0 for code in self.exit_codes)
+
+    @property
+    def label(self):
+        """'user@host:port', which tells apart entries that share a host."""
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        return f"{self.user}@{host}:{self.port}"
+
+
+class PrefixPrinter:
+    """Prints complete lines with a host prefix without interleaving them."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+
+    def write(self, prefix, line, stream=sys.stdout):
+        if not self.enabled:
+            return
+        with self.lock:
+            print(f"[{prefix}] {line}", file=stream)
+
+
+class LineBuffer:
+    """Splits a byte stream into lines, holding back a trailing partial line."""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.pending = b""
+        self.chunks = []
+
+    def feed(self, data):
+        self.chunks.append(data)
+        *lines, self.pending = (self.pending + data).split(b"\n")
+        for line in lines:
+            self.emit(line.decode("utf-8", "replace"))
+
+    def flush(self):
+        if self.pending:
+            self.emit(self.pending.decode("utf-8", "replace"))
+            self.pending = b""
+        return b"".join(self.chunks)
+
+
+def parse_host(entry, default_user, default_port):
+    """Splits '[user@]host[:port]' or '[user@][v6addr]:port' into (user, host, port).
+
+    A bare IPv6 address without brackets is taken as a host with no port.
+    Raises ValueError with a short reason if the entry is malformed.
+    """
+    user = default_user
+    port = str(default_port)
+    if "@" in entry:
+        user, entry = entry.split("@", 1)
+        if not user:
+            raise ValueError("empty user")
+
+    if entry.startswith("["):
+        host, sep, rest = entry[1:].partition("]")
+        if not sep or (rest and not rest.startswith(":")):
+            raise ValueError("expected [address]:port")
+        if rest:
+            port = rest[1:]
+    elif entry.count(":") == 1:
+        host, port = entry.split(":")
+    else:
+        host = entry
+
+    if not host or any(char.isspace() for char in host):
+        raise ValueError("invalid host")
+    if not (port.isascii() and port.isdigit() and 1 <= int(port) <= 65535):
+        raise ValueError(f"invalid port {port!r}")
+    return user, host, int(port)
+
+
+def parse_inventory(path, default_user, default_port):
+    """Reads an inventory file into a list of (user, host, port) tuples.
+
+    Malformed lines are reported on stderr with their line number and skipped.
+    """
+    hosts = []
+    with open(path, "r", encoding="utf-8") as inventory:
+        for number, line in enumerate(inventory, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                hosts.append(parse_host(line, default_user, default_port))
+            except ValueError as e:
+                print(f"{path}:{number}: skipping {line!r}: {e}", file=sys.stderr)
+    return hosts
+
+
+def connect(host, user, port=22, password=None, key_filename=None, timeout=10):
+    """Opens an authenticated SSH client for the host."""
     client = paramiko.SSHClient()
     # client also supports using key files
-    # client.load_system_host_keys("/home/user/.ssh/known_host")
+    client.load_system_host_keys()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(ip, username=user, password=passwd)
-    ssh_session = client.get_transport().open_session()
-    if ssh_session.active:
-        ssh_session.exec_command(command)
-        print(ssh_session.recv(1024))
-    return
+    client.connect(
+        host,
+        port=port,
+        username=user,
+        password=password,
+        key_filename=key_filename,
+        timeout=timeout,
+        banner_timeout=timeout,
+        auth_timeout=timeout,
+    )
+    return client
+
+
+def run_on_transport(transport, command, out, err, timeout):
+    """Runs one command over an existing transport, streaming its output.
+
+    Returns the exit status, or None if the command did not finish in time.
+    """
+    channel = transport.open_session(timeout=timeout)
+    try:
+        channel.exec_command(command)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            while channel.recv_ready():
+                out.feed(channel.recv(32768))
+            while channel.recv_stderr_ready():
+                err.feed(channel.recv_stderr(32768))
+
+            if channel.exit_status_ready() and not channel.recv_ready() \
+                    and not channel.recv_stderr_ready():
+                return channel.recv_exit_status()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # the channel's fileno becomes readable when new data arrives
+            select.select([channel], [], [], min(remaining, 0.1))
+    finally:
+        channel.close()
+
+
+def run_host(user, host, port, commands, printer, password=None, key_filename=None,
+             connect_timeout=10, command_timeout=60):
+    """Connects once to the host and runs every command over that connection.
+
+    Any error is recorded on the result rather than raised, so one bad
+    inventory entry cannot stop the rest of the fleet.
+    """
+    result = HostResult(user, host, port)
+    label = result.label
+    start = time.monotonic()
+    client = None
+
+    try:
+        client = connect(host, user, port, password, key_filename, connect_timeout)
+        transport = client.get_transport()
+
+        for command in commands:
+            out = LineBuffer(lambda line: printer.write(label, line))
+            err = LineBuffer(lambda line: printer.write(label + " err", line, sys.stderr))
+            code = run_on_transport(transport, command, out, err, command_timeout)
+            result.stdout.append(out.flush())
+            result.stderr.append(err.flush())
+            result.exit_codes.append(code)
+            if code is None:
+                printer.write(label, f"timed out after {command_timeout}s: {command}",
+                              sys.stderr)
+    except Exception as e:
+        # SSHException and OSError are the usual ones, but a malformed name
+        # raises UnicodeError from getaddrinfo and a dropped banner EOFError
+        result.error = str(e) or e.__class__.__name__
+        printer.write(label, f"error: {result.error}", sys.stderr)
+    finally:
+        if client is not None:
+            client.close()
+        result.elapsed = time.monotonic() - start
+
+    return result
+
+
+def run_fleet(hosts, commands, workers=32, printer=None, **kwargs):
+    """Runs the commands on every (user, host, port) with a bounded thread pool."""
+    printer = printer or PrefixPrinter()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_host, user, host, port, commands, printer, **kwargs)
+            for user, host, port in hosts
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    return results
+
+
+def ssh_command(ip, user, passwd, command):
+    """Runs a single command on a single host and prints its full output."""
+    result = run_host(user, ip, 22, [command], PrefixPrinter(), password=passwd)
+    return result.exit_codes[0] if result.exit_codes else None
+
+
+def print_summary(results):
+    """Prints one line per host followed by the overall counts."""
+    print("-" * 60)
+    for result in sorted(results, key=lambda r: (r.host, r.port, r.user)):
+        if result.error:
+            status = f"ERROR {result.error}"
+        else:
+            codes = ",".join("timeout" if c is None else str(c) for c in result.exit_codes)
+            status = f"{'OK' if result.ok else 'FAIL'} exit={codes}"
+        print(f"{result.label:<30} {result.elapsed:7.2f}s  {status}")
+    print("-" * 60)
+    ok = sum(1 for result in results if result.ok)
+    print(f"{ok}/{len(results)} hosts succeeded")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run commands on many hosts over SSH in parallel",
+        epilog='Example: python3 SSH-miko.py -i hosts.txt -u admin -P -c "uptime"',
+    )
+    parser.add_argument("-i", "--inventory", required=True,
+                        help="file with one [user@]host[:port] or [user@][ipv6]:port per line")
+    parser.add_argument("-c", "--command", action="append", required=True,
+                        help="command to run (repeat to run several in order)")
+    parser.add_argument("-u", "--user", default=getpass.getuser(),
+                        help="default username for hosts without user@")
+    parser.add_argument("-p", "--port", type=int, default=22,
+                        help="default SSH port for hosts without :port")
+    parser.add_argument("-k", "--key", help="private key file")
+    parser.add_argument("-P", "--ask-password", action="store_true",
+                        help="prompt for a password (or set SSH_PASSWORD)")
+    parser.add_argument("-w", "--workers", type=int, default=32,
+                        help="hosts to work on at once (default: 32)")
+    parser.add_argument("--connect-timeout", type=float, default=10,
+                        help="seconds allowed for connect and auth (default: 10)")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="seconds allowed per command (default: 60)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="only print the summary")
+    args = parser.parse_args()
+
+    password = os.environ.get("SSH_PASSWORD")
+    if args.ask_password:
+        password = getpass.getpass("SSH password: ")
+
+    hosts = parse_inventory(args.inventory, args.user, args.port)
+    if not hosts:
+        print("No hosts found in inventory")
+        sys.exit(1)
+
+    results = run_fleet(
+        hosts,
+        args.command,
+        workers=args.workers,
+        printer=PrefixPrinter(enabled=not args.quiet),
+        password=password,
+        key_filename=args.key,
+        connect_timeout=args.connect_timeout,
+        command_timeout=args.timeout,
+    )
+    print_summary(results)
+    sys.exit(0 if all(result.ok for result in results) else 1)
 
 
-ssh_command("192.168.1.1", "user", "password", "ls -l")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for python-tools.
+
+Runs each tool's hot path against local stand-ins (see standins.py) and
+records the numbers as JSON, one file per commit, so a regression shows up
+as soon as the next commit is benchmarked:
+
+    portscan   ports/sec for scan_ports() and scan_port() on open, closed
+               and filtered (blackholed) ports
+    udpscan    UDPScanner.scan() ports/sec on open and closed UDP ports,
+               uncapped and at the default --rate
+    bannergrab tcp-client.py run() endpoints/sec against SSH and HTTP
+               stand-ins, checking what grab() identifies
+    tcpserver  tcp-server.py serve() connections/sec and keep-alive
+               requests/sec, driven by tcp-loadgen.py run_load()
+    proxy      proxy_handler() throughput and the latency it adds on top of
+               a direct round trip to the echo backend
+    netkitty   client_handler() upload transfer rate
+    utmp       parseutmp() records/sec on a synthetic wtmp file
+    bruteforce brute_force() attempts/sec against a local login form
+               (needs requests)
+    ssh        SSH-miko.py run_fleet() commands/sec against a local SSH
+               server, checking connection reuse, stderr prefixes, the
+               per-command timeout and the summary (needs paramiko)
+
+Every benchmark runs --repeat times; each metric records the median and
+the spread between runs, and a change only counts as a regression when it
+is larger than both the threshold and that spread. Results land in
+benchmarks/results/, which is git-ignored because the numbers only mean
+something when compared on the same machine, and a run is only compared
+with earlier runs of the same size (--quick or not).
+
+Examples:
+    python3 benchmarks/bench.py                 # run all, compare with last run
+    python3 benchmarks/bench.py --quick -b proxy
+    python3 benchmarks/bench.py -r 5 -b udpscan      # more runs for a steadier median
+    python3 benchmarks/bench.py --compare benchmarks/results/1a2b3c4.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# the tools import netcore as a sibling package
+sys.path.insert(0, TOOLS_DIR)
+
+import netcore  # noqa: E402
+import standins  # noqa: E402
+
+
+def load_tool(name):
+    """Imports a tool script by file name (most have dashes in their names)."""
+    path = os.path.join(TOOLS_DIR, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def metric(value, unit, better="higher"):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_portscan(quick):
+    portscanner = load_tool("portscanner")
+    open_ports = standins.OpenPorts(20)
+    blackhole = standins.BlackholePort()
+    try:
+        # closed ports: a run of ports nothing listens on
+        count = 500 if quick else 2000
+        taken = set(open_ports.ports) | {blackhole.port}
+        closed = []
+        candidate = 20000
+        while len(closed) < count - len(open_ports.ports):
+            if candidate not in taken:
+                closed.append(candidate)
+            candidate += 1
+        ports = sorted(closed + open_ports.ports)
+
+        start = time.perf_counter()
+        found = netcore.run(portscanner.scan_ports("127.0.0.1", ports, concurrency=500,
+                                                   timeout=0.5))
+        async_elapsed = time.perf_counter() - start
+
+        # a filtered port costs a full timeout; with the blackhole in the
+        # list the whole concurrent scan should take about one timeout
+        start = time.perf_counter()
+        netcore.run(portscanner.scan_ports("127.0.0.1", ports + [blackhole.port],
+                                           concurrency=500, timeout=0.5))
+        filtered_elapsed = time.perf_counter() - start
+
+        sample = closed[:100] + open_ports.ports
+        start = time.perf_counter()
+        for port in sample:
+            portscanner.scan_port("127.0.0.1", port, timeout=0.5)
+        sync_elapsed = time.perf_counter() - start
+
+        filtered_open = portscanner.scan_port("127.0.0.1", blackhole.port, timeout=0.2)
+    finally:
+        open_ports.close()
+        blackhole.close()
+
+    return {
+        "async_ports_per_sec": metric(len(ports) / async_elapsed, "ports/s"),
+        "sync_ports_per_sec": metric(len(sample) / sync_elapsed, "ports/s"),
+        "with_filtered_scan_sec": metric(filtered_elapsed, "s", "lower"),
+        "open_ports_found": metric(len(set(found) & set(open_ports.ports)), "ports"),
+        "filtered_not_open": metric(int(not filtered_open), "bool"),
+    }
+
+
+def bench_udpscan(quick):
+    udp_client = load_tool("udp-client")
+    responders = standins.UDPResponders(20)
+    # the request's target: 1000 ports in seconds, not minutes
+    count = 1000
+    ports = sorted(standins.closed_udp_ports(count - len(responders.ports))
+                   + responders.ports)
+    try:
+        # loopback does not rate limit ICMP, so an uncapped scan measures
+        # the scanner itself
+        scanner = udp_client.UDPScanner(["127.0.0.1"], ports, rate=0, timeout=0.5)
+        start = time.perf_counter()
+        results = scanner.scan()
+        uncapped_elapsed = time.perf_counter() - start
+
+        capped = udp_client.UDPScanner(["127.0.0.1"], ports, timeout=0.5)
+        start = time.perf_counter()
+        capped.scan()
+        capped_elapsed = time.perf_counter() - start
+    finally:
+        responders.close()
+
+    expected = {("127.0.0.1", port): udp_client.CLOSED for port in ports}
+    expected.update({("127.0.0.1", port): udp_client.OPEN for port in responders.ports})
+    return {
+        "ports_per_sec": metric(len(ports) / uncapped_elapsed, "ports/s"),
+        "default_rate_scan_sec": metric(capped_elapsed, "s", "lower"),
+        "probes_per_port": metric(scanner.metrics.counter("probes_sent").value / len(ports),
+                                  "probes", "lower"),
+        "states_correct": metric(int(results == expected and capped.results == expected),
+                                 "bool"),
+    }
+
+
+def bench_bannergrab(quick):
+    tcp_client = load_tool("tcp-client")
+    ssh = standins.BannerServer(banner=b"SSH-2.0-OpenSSH_9.6p1 Ubuntu-3ubuntu13\r\n")
+    http = standins.BannerServer(
+        reply=b"HTTP/1.1 200 OK\r\nServer: nginx/1.24.0\r\nContent-Length: 0\r\n\r\n")
+    count = 500 if quick else 2000
+    # HTTP waits out the passive read before it is probed, so that wait is
+    # what bounds the HTTP half of the run
+    passive_timeout = 0.2
+    endpoints = [ssh.address, http.address] * (count // 2)
+    results = []
+    try:
+        start = time.perf_counter()
+        netcore.run(tcp_client.run(endpoints, concurrency=200, on_result=results.append,
+                                   passive_timeout=passive_timeout))
+        elapsed = time.perf_counter() - start
+    finally:
+        ssh.close()
+        http.close()
+
+    expected = {
+        ssh.address[1]: ("ssh", "OpenSSH_9.6p1 Ubuntu-3ubuntu13"),
+        http.address[1]: ("http", "nginx/1.24.0"),
+    }
+    return {
+        "endpoints_per_sec": metric(len(results) / elapsed, "endpoints/s"),
+        "identified": metric(
+            int(len(results) == len(endpoints) and all(
+                (r["service"], r["version"]) == expected[r["port"]] for r in results)),
+            "bool"),
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def bench_tcpserver(quick):
+    tcp_server = load_tool("tcp-server")
+    loadgen = load_tool("tcp-loadgen")
+    port = _free_port()
+
+    # the server gets its own event loop in a thread, the load generator
+    # runs on the main thread's; cancelling the server task makes
+    # netcore.run() return and clean up the connections still open
+    server = {}
+    started = threading.Event()
+
+    async def serve():
+        server["loop"] = asyncio.get_running_loop()
+        server["task"] = asyncio.current_task()
+        runner = asyncio.all_tasks()
+        started.set()
+        try:
+            await tcp_server.serve("127.0.0.1", port, keep_alive=True, log_data=False)
+        finally:
+            # the load generator has closed every connection; let their
+            # handlers finish rather than cancelling them mid-close
+            handlers = asyncio.all_tasks() - runner
+            if handlers:
+                await asyncio.wait(handlers, timeout=2)
+
+    thread = threading.Thread(target=netcore.run, args=(serve(),), daemon=True)
+    thread.start()
+    started.wait()
+    try:
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+        connections = 2000 if quick else 10000
+        fresh = netcore.run(loadgen.run_load("127.0.0.1", port, connections=connections))
+        reused = netcore.run(loadgen.run_load("127.0.0.1", port, connections=connections // 10,
+                                              requests_per_conn=10))
+    finally:
+        server["loop"].call_soon_threadsafe(server["task"].cancel)
+        thread.join()
+
+    return {
+        "conn_per_sec": metric(fresh["conn_per_sec"], "conn/s"),
+        "keepalive_req_per_sec": metric(reused["req_per_sec"], "req/s"),
+        "conn_p99_ms": metric(fresh["p99_ms"], "ms", "lower"),
+        "no_errors": metric(int(not fresh["errors"] and not reused["errors"]), "bool"),
+    }
+
+
+def _round_trips(address, count, size=64):
+    """Measures ping-pong latency to an echo service."""
+    histogram = netcore.Histogram()
+    payload = b"x" * size
+    view = memoryview(bytearray(size))
+    with socket.create_connection(address) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for _ in range(count):
+            start = time.perf_counter()
+            sock.sendall(payload)
+            received = 0
+            while received < size:
+                received += sock.recv_into(view[received:])
+            histogram.observe(time.perf_counter() - start)
+    return histogram
+
+
+def _stream(address, total, chunk=65536):
+    """Sends total bytes through an echo path and times until all are back."""
+    block = b"\x00" * chunk
+    view = memoryview(bytearray(chunk))
+    with socket.create_connection(address) as sock:
+        def sender():
+            sent = 0
+            while sent < total:
+                sock.sendall(block)
+                sent += chunk
+
+        start = time.perf_counter()
+        thread = threading.Thread(target=sender, daemon=True)
+        thread.start()
+        received = 0
+        while received < total:
+            size = sock.recv_into(view)
+            if not size:
+                break
+            received += size
+        elapsed = time.perf_counter() - start
+        thread.join()
+    return received, elapsed
+
+
+def bench_proxy(quick):
+    tcp_proxy = load_tool("tcp-proxy")
+    echo = standins.EchoServer()
+    proxy = standins.Acceptor(
+        lambda client: tcp_proxy.proxy_handler(client, echo.address[0], echo.address[1],
+                                               False, verbose=False)
+    )
+    try:
+        total = (16 if quick else 64) * 1024 * 1024
+        received, elapsed = _stream(proxy.address, total)
+
+        trips = 500 if quick else 2000
+        direct = _round_trips(echo.address, trips)
+        proxied = _round_trips(proxy.address, trips)
+    finally:
+        proxy.close()
+        echo.close()
+
+    return {
+        "bytes_per_sec": metric(received / elapsed, "B/s"),
+        "direct_p50_us": metric(direct.percentile(50) * 1e6, "us", "lower"),
+        "proxied_p50_us": metric(proxied.percentile(50) * 1e6, "us", "lower"),
+        "added_p50_us": metric((proxied.percentile(50) - direct.percentile(50)) * 1e6,
+                               "us", "lower"),
+        "added_p99_us": metric((proxied.percentile(99) - direct.percentile(99)) * 1e6,
+                               "us", "lower"),
+    }
+
+
+def bench_netkitty(quick):
+    netkitty = load_tool("netkitty")
+    total = (32 if quick else 128) * 1024 * 1024
+    block = b"\x00" * 65536
+
+    with tempfile.TemporaryDirectory() as tmp:
+        netkitty.upload_destination = os.path.join(tmp, "upload.bin")
+        server = standins.Acceptor(netkitty.client_handler)
+        try:
+            with socket.create_connection(server.address) as sock:
+                start = time.perf_counter()
+                sent = 0
+                while sent < total:
+                    sock.sendall(block)
+                    sent += len(block)
+                sock.shutdown(socket.SHUT_WR)
+                reply = sock.recv(256)
+                elapsed = time.perf_counter() - start
+        finally:
+            server.close()
+        written = os.path.getsize(netkitty.upload_destination)
+
+    return {
+        "upload_bytes_per_sec": metric(total / elapsed, "B/s"),
+        "upload_complete": metric(int(written == total and reply.startswith(b"Success")),
+                                  "bool"),
+    }
+
+
+def bench_utmp(quick):
+    utmp = load_tool("utmp")
+    records = 10000 if quick else 50000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = standins.write_utmp(os.path.join(tmp, "wtmp"), records)
+        output = io.StringIO()
+        with open(path, "rb") as utmp_file:
+            start = time.perf_counter()
+            utmp.parseutmp(os.path.getsize(path), utmp_file, output)
+            elapsed = time.perf_counter() - start
+
+    return {
+        "records_per_sec": metric(records / elapsed, "records/s"),
+        "records_parsed": metric(output.getvalue().count("\n"), "records"),
+    }
+
+
+def bench_bruteforce(quick):
+    bruteforce = load_tool("bruteforce")
+    # the password sits partway into the keyspace: m437 is candidate 12437
+    form = standins.LoginForm(password="c437" if quick else "m437")
+    try:
+        start = time.perf_counter()
+        password, _, metrics = bruteforce.brute_force(form.url, "admin", workers=16,
+                                                      progress=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        form.close()
+
+    request = metrics.histogram("request")
+    return {
+        "attempts_per_sec": metric(metrics.counter("attempts").value / elapsed, "attempts/s"),
+        "request_p50_us": metric(request.percentile(50) * 1e6, "us", "lower"),
+        "password_found": metric(int(password == ("c437" if quick else "m437")), "bool"),
+    }
+
+
+def bench_ssh(quick):
+    ssh = load_tool("SSH-miko")
+    hosts = 4 if quick else 16
+    commands = ["hostname", "uptime", "false", "sleep 60"]
+    timeout = 0.5
+    lines = []
+
+    class RecordingPrinter(ssh.PrefixPrinter):
+        def write(self, prefix, line, stream=sys.stdout):
+            lines.append((prefix, line, stream))
+
+    server = standins.SSHServer()
+    try:
+        host, port = server.address
+        start = time.perf_counter()
+        inventory = [(f"user{index}", host, port) for index in range(hosts)]
+        results = ssh.run_fleet(inventory, commands, workers=hosts,
+                                printer=RecordingPrinter(), password="toor",
+                                command_timeout=timeout)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.close()
+
+    summary = io.StringIO()
+    with contextlib.redirect_stdout(summary):
+        ssh.print_summary(results)
+    summary = summary.getvalue()
+
+    # every entry's stderr carries its own user@host:port prefix
+    failed_prefixes = {prefix for prefix, line, stream in lines
+                       if line == "failed" and stream is sys.stderr}
+    # the sleeping command costs one timeout per host, the rest is overhead
+    instant = hosts * (len(commands) - 1)
+    return {
+        "commands_per_sec": metric(instant / max(elapsed - timeout, 1e-9), "commands/s"),
+        "one_transport_per_host": metric(
+            int(server.transports == hosts and server.channels == hosts * len(commands)),
+            "bool"),
+        "stderr_prefixed": metric(
+            int(failed_prefixes == {f"{r.label} err" for r in results} == {
+                f"user{index}@{host}:{port} err" for index in range(hosts)}
+                and all(r.stderr[2] == b"warning: about to fail\nfailed\n" for r in results)),
+            "bool"),
+        "timeout_reported": metric(
+            int(all(r.error is None and r.exit_codes == [0, 0, 1, None] for r in results)),
+            "bool"),
+        "summary_correct": metric(
+            int(summary.count("FAIL exit=0,0,1,timeout") == hosts
+                and all(f"{r.label} " in summary for r in results)
+                and f"0/{hosts} hosts succeeded" in summary),
+            "bool"),
+    }
+
+
+BENCHMARKS = {
+    "portscan": bench_portscan,
+    "udpscan": bench_udpscan,
+    "bannergrab": bench_bannergrab,
+    "tcpserver": bench_tcpserver,
+    "proxy": bench_proxy,
+    "netkitty": bench_netkitty,
+    "utmp": bench_utmp,
+    "bruteforce": bench_bruteforce,
+    "ssh": bench_ssh,
+}
+
+
+def git_revision():
+    """Short commit hash of the tree being benchmarked, '-dirty' if modified."""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=TOOLS_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "."], cwd=TOOLS_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return rev + ("-dirty" if dirty else "")
+
+
+def combine(samples):
+    """
+    Merges repeated runs of one benchmark into a single set of metrics.
+
+    Each metric keeps the median of its runs and, when there is more than
+    one, their spread in percent of that median. A bool check keeps its
+    worst run, so a check that fails even once reports as failed.
+    """
+    combined = {}
+    for key, first in samples[0].items():
+        values = [sample[key]["value"] for sample in samples]
+        if first["unit"] == "bool":
+            combined[key] = metric(min(values), "bool", first["better"])
+            continue
+        combined[key] = metric(statistics.median(values), first["unit"], first["better"])
+        if len(values) > 1 and combined[key]["value"]:
+            combined[key]["spread"] = (max(values) - min(values)) / abs(combined[key]["value"]) * 100
+    return combined
+
+
+def comparable(results, baseline):
+    """True if baseline ran the same workloads as results (--quick or not)."""
+    return baseline.get("quick") == results["quick"]
+
+
+def latest_result(results, exclude):
+    """
+    Most recently written results file other than exclude that is comparable
+    with results and covers every benchmark in it, or None.
+    """
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    candidates = []
+    for name in os.listdir(RESULTS_DIR):
+        path = os.path.join(RESULTS_DIR, name)
+        if not name.endswith(".json") or os.path.abspath(path) == os.path.abspath(exclude):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as results_file:
+                baseline = json.load(results_file)
+        except (OSError, ValueError):
+            continue
+        if comparable(results, baseline) and \
+                set(results["benchmarks"]) <= set(baseline.get("benchmarks", {})):
+            candidates.append(path)
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def print_results(results, baseline=None, threshold=10.0):
+    """Prints every metric, with the change against baseline when given.
+
+    A change is flagged as a regression only when it is worse than threshold
+    percent and also larger than the run-to-run spread of either result,
+    which would otherwise turn ordinary noise into regressions.
+
+    Returns:
+        int: The number of metrics that regressed
+    """
+    regressions = 0
+    previous = baseline["benchmarks"] if baseline else {}
+    for name, metrics in results["benchmarks"].items():
+        print(f"\n[{name}]")
+        for key, data in metrics.items():
+            line = f"  {key:<26} {data['value']:>16,.1f} {data['unit']}"
+            if "spread" in data:
+                line += f"  spread {data['spread']:4.1f}%"
+            old = previous.get(name, {}).get(key)
+            if old and old["value"] and data["unit"] != "bool":
+                change = (data["value"] - old["value"]) / abs(old["value"]) * 100
+                limit = max(threshold, data.get("spread", 0), old.get("spread", 0))
+                worse = change < -limit if data["better"] == "higher" else change > limit
+                line += f"   {change:+7.1f}%"
+                if worse:
+                    line += "  REGRESSION"
+                    regressions += 1
+            elif data["unit"] == "bool" and not data["value"]:
+                line += "  FAILED"
+                regressions += 1
+            print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the python-tools hot paths")
+    parser.add_argument("-b", "--bench", action="append", choices=sorted(BENCHMARKS),
+                        help="benchmark to run (repeatable, default: all)")
+    parser.add_argument("--quick", action="store_true",
+                        help="smaller workloads for a fast smoke run")
+    parser.add_argument("-o", "--output",
+                        help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare",
+                        help="results file to compare with (default: the latest other run)")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent change reported as a regression (default: 10)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="runs per benchmark; metrics keep the median (default: 3)")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    netcore.raise_fd_limit()
+    revision = git_revision()
+    results = {
+        "commit": revision,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "repeat": args.repeat,
+        "benchmarks": {},
+    }
+
+    for name in args.bench or BENCHMARKS:
+        print(f"[*] Running {name}...", file=sys.stderr)
+        try:
+            samples = [BENCHMARKS[name](args.quick) for _ in range(args.repeat)]
+            results["benchmarks"][name] = combine(samples)
+        except ImportError as e:
+            # optional dependency of that tool is not installed
+            print(f"[-] Skipping {name}: {e}", file=sys.stderr)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2)
+
+    baseline_path = args.compare or latest_result(results, output)
+    baseline = None
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if comparable(results, baseline):
+            print(f"Comparing {revision} with {baseline['commit']} ({baseline_path})")
+        else:
+            print(f"[-] Not comparing with {baseline_path}: it is a "
+                  f"{'quick' if baseline.get('quick') else 'full'} run", file=sys.stderr)
+            baseline = None
+
+    regressions = print_results(results, baseline, args.threshold)
+    print(f"\nResults written to {output}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+Local stand-ins for the services the python-tools talk to.
+
+Everything here binds to 127.0.0.1 on an ephemeral port and runs in daemon
+threads, so benchmarks need no network access, root or iptables rules.
+
+    OpenPorts         listeners that accept and close (open ports)
+    BlackholePort     a port whose SYNs are dropped (filtered port)
+    EchoServer        echoes every byte back (proxy/latency backend)
+    BannerServer      sends a banner and/or answers one request, then closes
+    UDPResponders     UDP ports that answer every datagram (open UDP ports)
+    closed_udp_ports() UDP ports nothing is bound to (ICMP port unreachable)
+    LoginForm         keep-alive HTTP login form with one valid password
+    SSHServer         paramiko SSH server running scripted commands (needs paramiko)
+    write_utmp()      synthetic utmp/wtmp files in the layout utmp.py reads
+"""
+
+import ipaddress
+import selectors
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# utmp record layout read by utmp.parseutmp(): 384 bytes, little endian
+# except for the IPv4 address, which is stored in network order
+UTMP_RECORD = struct.Struct("<LL32s4s32s256sHHLLL")
+UTMP_SIZE = 384
+UTMP_PAD = UTMP_SIZE - UTMP_RECORD.size - 4
+
+
+def _listener(backlog=socket.SOMAXCONN):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(backlog)
+    return sock
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+class OpenPorts:
+    """
+    Listens on count ephemeral ports, accepting and closing every connection.
+
+    Attributes:
+        ports (list): The port numbers that are open
+    """
+
+    def __init__(self, count):
+        self._socks = [_listener() for _ in range(count)]
+        self.ports = sorted(sock.getsockname()[1] for sock in self._socks)
+        for sock in self._socks:
+            _start(self._accept_loop, sock)
+
+    @staticmethod
+    def _accept_loop(sock):
+        while True:
+            try:
+                client, _ = sock.accept()
+            except OSError:
+                return
+            client.close()
+
+    def close(self):
+        for sock in self._socks:
+            sock.close()
+
+
+class BlackholePort:
+    """
+    A port that silently drops new connections, like a firewalled port.
+
+    A listener with a backlog of 0 that never calls accept() stops answering
+    SYNs once its accept queue is full. The queue is filled here, so every
+    later connect() times out exactly as it would against a DROP rule.
+    """
+
+    def __init__(self, fill_timeout=0.2):
+        self._server = _listener(backlog=0)
+        self.port = self._server.getsockname()[1]
+        self._held = []
+        while True:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(fill_timeout)
+            try:
+                sock.connect(("127.0.0.1", self.port))
+            except socket.timeout:
+                sock.close()
+                break
+            self._held.append(sock)
+
+    def close(self):
+        for sock in self._held:
+            sock.close()
+        self._server.close()
+
+
+class EchoServer:
+    """
+    Threaded echo backend; every connection gets its own thread.
+
+    Attributes:
+        address (tuple): (host, port) to connect to
+    """
+
+    def __init__(self, bufsize=65536):
+        self.bufsize = bufsize
+        self._server = _listener()
+        self.address = self._server.getsockname()
+        _start(self._accept_loop)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            _start(self._echo, client)
+
+    def _echo(self, client):
+        view = memoryview(bytearray(self.bufsize))
+        try:
+            while True:
+                size = client.recv_into(view)
+                if not size:
+                    break
+                client.sendall(view[:size])
+        except OSError:
+            pass
+        finally:
+            client.close()
+
+    def close(self):
+        self._server.close()
+
+
+class BannerServer:
+    """
+    A service for tcp-client.py to fingerprint.
+
+    Sends banner as soon as a client connects (server-first protocols such
+    as SSH), then, if reply is set, waits for one request and answers it
+    (client-first protocols such as HTTP) before closing.
+
+    Attributes:
+        address (tuple): (host, port) to connect to
+    """
+
+    def __init__(self, banner=b"", reply=b""):
+        self.banner = banner
+        self.reply = reply
+        self._server = _listener()
+        self.address = self._server.getsockname()
+        _start(self._accept_loop)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            _start(self._serve, client)
+
+    def _serve(self, client):
+        try:
+            if self.banner:
+                client.sendall(self.banner)
+            if self.reply and client.recv(4096):
+                client.sendall(self.reply)
+        except OSError:
+            pass
+        finally:
+            client.close()
+
+    def close(self):
+        self._server.close()
+
+
+class UDPResponders:
+    """
+    Binds count UDP ports and answers every datagram with reply.
+
+    Attributes:
+        ports (list): The port numbers that answer
+    """
+
+    def __init__(self, count, reply=b"pong"):
+        self.reply = reply
+        self._socks = []
+        self._selector = selectors.DefaultSelector()
+        for _ in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(("127.0.0.1", 0))
+            sock.setblocking(False)
+            self._selector.register(sock, selectors.EVENT_READ)
+            self._socks.append(sock)
+        self.ports = sorted(sock.getsockname()[1] for sock in self._socks)
+        self._closed = threading.Event()
+        self._thread = _start(self._serve)
+
+    def _serve(self):
+        while not self._closed.is_set():
+            for key, _ in self._selector.select(0.1):
+                try:
+                    _, addr = key.fileobj.recvfrom(4096)
+                    key.fileobj.sendto(self.reply, addr)
+                except OSError:
+                    pass
+
+    def close(self):
+        self._closed.set()
+        self._thread.join()
+        self._selector.close()
+        for sock in self._socks:
+            sock.close()
+
+
+def closed_udp_ports(count, start=40000):
+    """Returns count UDP ports from start upwards that nothing is bound to."""
+    ports = []
+    port = start
+    while len(ports) < count and port <= 65535:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind(("127.0.0.1", port))
+        except OSError:
+            pass
+        else:
+            ports.append(port)
+        finally:
+            sock.close()
+        port += 1
+    return ports
+
+
+class Acceptor:
+    """
+    Listens on an ephemeral port and hands every accepted socket to handler
+    in a new thread - the accept loop of a tool without its CLI.
+
+    Attributes:
+        address (tuple): (host, port) to connect to
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self._server = _listener()
+        self.address = self._server.getsockname()
+        _start(self._accept_loop)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            _start(self.handler, client)
+
+    def close(self):
+        self._server.close()
+
+
+class LoginForm:
+    """
+    A stand-in for the lab login page bruteforce.py targets.
+
+    Accepts POSTs of username/password form fields over HTTP/1.1 keep-alive
+    and answers "Invalid" unless both match.
+
+    Attributes:
+        url (str): The form's POST URL
+        attempts (int): Number of login attempts received
+    """
+
+    def __init__(self, username="admin", password="m437"):
+        form = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately; without this, Nagle
+            # and delayed ACKs add ~40 ms to every response
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                fields = parse_qs(self.rfile.read(length).decode())
+                form.attempts += 1
+                if fields.get("username") == [username] and fields.get("password") == [password]:
+                    body = b"<h1>Welcome back</h1>"
+                else:
+                    body = b"<p>Invalid username or password</p>"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.attempts = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        host, port = self._server.server_address
+        self.url = f"http://{host}:{port}/labs/lab1/index.php"
+        _start(self._server.serve_forever)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SSHServer:
+    """
+    A password-only SSH server for SSH-miko.py, built on paramiko.
+
+    Any user name is accepted with the right password (or only username, if
+    one is given), so a fleet of distinct user@host:port entries can share
+    one server.
+
+    Commands are not executed; each one is looked up in commands, which maps
+    a command line to (stdout, stderr, exit status, seconds to run). Unknown
+    commands write an error to stderr and exit 127. A command that is still
+    running when the client closes its channel is abandoned, as sshd would.
+
+    Attributes:
+        address (tuple): (host, port) to connect to
+        transports (int): SSH connections accepted
+        channels (int): Command channels opened across all connections
+    """
+
+    COMMANDS = {
+        "hostname": (b"standin\n", b"", 0, 0),
+        "uptime": (b" 12:00:00 up 1 day,  1 user,  load average: 0.00\n", b"", 0, 0),
+        "false": (b"", b"warning: about to fail\nfailed\n", 1, 0),
+        "sleep 60": (b"", b"", 0, 60),
+    }
+
+    def __init__(self, username=None, password="toor", commands=None):
+        import paramiko  # optional: only the ssh benchmark needs it
+
+        self._paramiko = paramiko
+        self.username = username
+        self.password = password
+        self.commands = commands if commands is not None else self.COMMANDS
+        self.transports = 0
+        self.channels = 0
+        self._lock = threading.Lock()
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._server = _listener()
+        self.address = self._server.getsockname()
+        _start(self._accept_loop)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            _start(self._serve, client)
+
+    def _serve(self, client):
+        paramiko = self._paramiko
+        standin = self
+
+        class Interface(paramiko.ServerInterface):
+            def get_allowed_auths(self, username):
+                return "password"
+
+            def check_auth_password(self, username, password):
+                if password == standin.password and standin.username in (None, username):
+                    return paramiko.AUTH_SUCCESSFUL
+                return paramiko.AUTH_FAILED
+
+            def check_channel_request(self, kind, chanid):
+                if kind == "session":
+                    return paramiko.OPEN_SUCCEEDED
+                return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+            def check_channel_exec_request(self, channel, command):
+                with standin._lock:
+                    standin.channels += 1
+                _start(standin._run, channel, command.decode())
+                return True
+
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self._host_key)
+        try:
+            transport.start_server(server=Interface())
+        except (paramiko.SSHException, EOFError, OSError):
+            transport.close()
+            return
+        with self._lock:
+            self.transports += 1
+
+    def _run(self, channel, command):
+        stdout, stderr, status, duration = self.commands.get(
+            command, (b"", f"sh: {command}: not found\n".encode(), 127, 0))
+        # paramiko answers the exec request only after
+        # check_channel_exec_request returns; closing the channel before
+        # that reply goes out makes the client's exec_command fail
+        time.sleep(0.01)
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline and not channel.closed:
+            time.sleep(0.02)
+        try:
+            channel.sendall(stdout)
+            channel.sendall_stderr(stderr)
+            channel.send_exit_status(status)
+            channel.close()
+        except (OSError, EOFError):
+            pass
+
+    def close(self):
+        self._server.close()
+
+
+def utmp_record(index, start=1700000000):
+    """Builds one USER_PROCESS record with plausible, varying fields."""
+    fields = UTMP_RECORD.pack(
+        7,                                  # USER_PROCESS
+        1000 + index % 30000,               # pid
+        f"pts/{index % 64}".encode(),       # line
+        f"{index % 10000}".encode(),        # id
+        f"user{index % 500}".encode(),      # user
+        f"host-{index % 997}.example.com".encode(),
+        0,                                  # termination status
+        0,                                  # exit status
+        index,                              # session
+        start + index * 7,                  # seconds
+        (index * 7919) % 1000000,           # microseconds
+    )
+    addr = int(ipaddress.IPv4Address("10.0.0.0")) + index % 65536
+    return fields + struct.pack(">L", addr) + b"\x00" * UTMP_PAD
+
+
+def write_utmp(path, records):
+    """Writes a synthetic utmp/wtmp file with the given number of records."""
+    with open(path, "wb") as utmp_file:
+        for index in range(records):
+            utmp_file.write(utmp_record(index))
+    return path
+
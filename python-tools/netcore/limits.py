@@ -0,0 +1,115 @@
+"""Concurrency and rate limits for threaded and asyncio tools."""
+
+import asyncio
+import threading
+import time
+
+
+class ConnectionLimiter:
+    """
+    Caps the number of connections in flight.
+
+    Works as a context manager from threads (``with limiter:``) and from
+    coroutines (``async with limiter:``). Use one style per instance.
+
+    Args:
+        limit (int): Maximum concurrent holders
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.peak = 0
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._async_semaphore = None
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def acquire(self, timeout=None):
+        """Blocks until a slot is free; returns False if timeout expires first."""
+        if not self._semaphore.acquire(timeout=timeout):
+            return False
+        self._enter()
+        return True
+
+    def release(self):
+        self._exit()
+        self._semaphore.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    async def __aenter__(self):
+        # created lazily so the semaphore binds to the running loop
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self.limit)
+        await self._async_semaphore.acquire()
+        self._enter()
+        return self
+
+    async def __aexit__(self, *exc):
+        self._exit()
+        self._async_semaphore.release()
+
+
+class RateLimiter:
+    """
+    Token bucket limiting events (packets, requests) per second.
+
+    Args:
+        rate (float): Sustained events per second; 0 or less means unlimited
+        burst (float): Bucket size, defaults to 1/20th of a second of events
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else max(1.0, self.rate / 20)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, n=1):
+        """Takes n tokens if they are available right now."""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            self._refill()
+            if self._tokens >= n:
+                self._tokens -= n
+                return True
+            return False
+
+    def wait_time(self, n=1):
+        """Seconds until n tokens will be available (0 if they already are)."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            return max(0.0, (n - self._tokens) / self.rate)
+
+    def acquire(self, n=1):
+        """Blocks the calling thread until n tokens have been taken."""
+        while not self.try_acquire(n):
+            time.sleep(self.wait_time(n))
+
+    async def acquire_async(self, n=1):
+        """Waits without blocking the event loop until n tokens have been taken."""
+        while not self.try_acquire(n):
+            await asyncio.sleep(self.wait_time(n))
@@ -0,0 +1,75 @@
+"""Event loop runner and process limits shared by the asyncio tools."""
+
+import asyncio
+import signal
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import uvloop
+except ImportError:  # optional, asyncio's default loop is used without it
+    uvloop = None
+
+
+def run(main, use_uvloop=True):
+    """
+    Runs a coroutine to completion on a fresh event loop.
+
+    uvloop is used when it is installed. Ctrl-C and SIGTERM stop the loop
+    quietly instead of printing a traceback.
+
+    Args:
+        main (coroutine): The coroutine to run
+        use_uvloop (bool): Set to False to force asyncio's default loop
+
+    Returns:
+        The coroutine's result, or None if it was interrupted
+    """
+    try:
+        if use_uvloop and uvloop is not None:
+            return uvloop.run(_cancel_on_sigterm(main))
+        return asyncio.run(_cancel_on_sigterm(main))
+    except KeyboardInterrupt:
+        return None
+
+
+async def _cancel_on_sigterm(main):
+    """Runs main as a task that SIGTERM cancels, returning None if it was."""
+    task = asyncio.ensure_future(main)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    except (NotImplementedError, RuntimeError):  # Windows, or not the main thread
+        pass
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise
+        return None
+
+
+def raise_fd_limit():
+    """
+    Lifts the open file soft limit to the hard limit.
+
+    Every socket is a file descriptor, so tools holding thousands of
+    connections run out of them long before anything else.
+
+    Returns:
+        int: The soft limit now in effect, or None if it cannot be read
+    """
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        target = hard if hard != resource.RLIM_INFINITY else max(soft, 1048576)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
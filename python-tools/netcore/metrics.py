@@ -0,0 +1,134 @@
+"""Counters and latency histograms collected while a tool runs."""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Counter:
+    """A thread-safe running total."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+
+class Histogram:
+    """
+    Records samples (usually seconds) and reports percentiles.
+
+    Once max_samples have been seen, reservoir sampling keeps memory flat
+    while the percentiles stay representative.
+
+    Args:
+        max_samples (int): Largest number of samples kept
+    """
+
+    def __init__(self, max_samples=100000):
+        self.max_samples = max_samples
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._samples = []
+        self._sorted = True
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+            if len(self._samples) < self.max_samples:
+                self._samples.append(value)
+            else:
+                slot = random.randrange(self.count)
+                if slot < self.max_samples:
+                    self._samples[slot] = value
+            self._sorted = False
+
+    def percentile(self, pct):
+        """Nearest-rank percentile of the kept samples (0.0 when empty)."""
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            if not self._sorted:
+                self._samples.sort()
+                self._sorted = True
+            rank = round(pct / 100 * len(self._samples)) - 1
+            return self._samples[max(0, min(len(self._samples) - 1, rank))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min or 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max or 0.0,
+        }
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms, created on first use.
+
+    Example:
+        metrics = MetricsRegistry()
+        metrics.counter("bytes_in").inc(len(data))
+        with metrics.timer("connect"):
+            sock.connect(addr)
+        print(metrics.snapshot())
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name):
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter()
+            return self._counters[name]
+
+    def histogram(self, name):
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram()
+            return self._histograms[name]
+
+    @contextmanager
+    def timer(self, name):
+        """Observes the elapsed seconds of the with-block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).observe(time.perf_counter() - start)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def rate(self, name):
+        """Counter value per second since the registry was created."""
+        elapsed = self.elapsed()
+        return self.counter(name).value / elapsed if elapsed else 0.0
+
+    def snapshot(self):
+        """All metrics as a plain dict, ready for printing or json.dump."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+        return {
+            "elapsed": self.elapsed(),
+            "counters": {name: c.value for name, c in counters.items()},
+            "histograms": {name: h.summary() for name, h in histograms.items()},
+        }
@@ -0,0 +1,153 @@
+"""Buffered socket streams for the blocking (threaded) tools.
+
+Reads go through recv_into() on one preallocated buffer, so a transfer does
+not allocate a new bytes object per recv() and never grows a buffer with
+``+=``, which copies everything received so far on every chunk.
+"""
+
+import select
+import socket
+
+
+class BufferedReader:
+    """
+    Reads from a connected socket through a reusable receive buffer.
+
+    Args:
+        sock (socket.socket): A connected stream socket
+        bufsize (int): Size of the receive buffer (largest single read)
+    """
+
+    def __init__(self, sock, bufsize=65536):
+        self.sock = sock
+        self._buffer = bytearray(bufsize)
+        self._view = memoryview(self._buffer)
+        # bytes received past the last line returned by readline()
+        self._pending = bytearray()
+
+    def recv_chunk(self):
+        """
+        Waits for the next chunk of data.
+
+        Returns:
+            memoryview: The bytes received, empty at EOF. The view is only
+            valid until the next read, copy it with bytes() to keep it.
+        """
+        if self._pending:
+            size = min(len(self._pending), len(self._buffer))
+            self._view[:size] = self._pending[:size]
+            del self._pending[:size]
+            return self._view[:size]
+        size = self.sock.recv_into(self._view)
+        return self._view[:size]
+
+    def iter_chunks(self):
+        """Yields chunks (as memoryviews) until the peer closes the connection."""
+        while True:
+            chunk = self.recv_chunk()
+            if not chunk:
+                return
+            yield chunk
+
+    def _ready(self, timeout):
+        if self._pending:
+            return True
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        return bool(readable)
+
+    def read_available(self, timeout=None, limit=None):
+        """
+        Waits up to timeout for data, then takes everything already queued.
+
+        Unlike looping on recv() until a timeout fires, this returns as soon
+        as the socket runs dry, so a request/response exchange is not delayed
+        by the timeout.
+
+        Args:
+            timeout (float): Seconds to wait for the first byte, None for ever
+            limit (int): Stop once this many bytes are collected
+
+        Returns:
+            bytes: The data read, empty on EOF or timeout
+        """
+        data = bytearray()
+        try:
+            if not self._ready(timeout):
+                return b""
+            while True:
+                chunk = self.recv_chunk()
+                if not chunk:
+                    break
+                data += chunk
+                if limit is not None and len(data) >= limit:
+                    break
+                if not self._ready(0):
+                    break
+        except (socket.timeout, BlockingIOError):
+            pass
+        return bytes(data)
+
+    def readline(self, delimiter=b"\n", limit=65536):
+        """
+        Reads up to and including the delimiter.
+
+        Returns:
+            bytes: The line, or whatever was left when the peer closed
+        """
+        line = self._pending
+        self._pending = bytearray()
+        start = 0
+        while True:
+            index = line.find(delimiter, start)
+            if index >= 0:
+                end = index + len(delimiter)
+                self._pending = line[end:]
+                return bytes(line[:end])
+            if len(line) >= limit:
+                self._pending = line[limit:]
+                return bytes(line[:limit])
+            start = max(0, len(line) - len(delimiter) + 1)
+            size = self.sock.recv_into(self._view)
+            if not size:
+                return bytes(line)
+            line += self._view[:size]
+
+    def read_all(self):
+        """Reads until EOF and returns everything as one bytes object."""
+        data = bytearray(self._pending)
+        self._pending = bytearray()
+        for chunk in self.iter_chunks():
+            data += chunk
+        return bytes(data)
+
+
+class BufferedWriter:
+    """
+    Collects small writes and sends them with a single sendall().
+
+    Args:
+        sock (socket.socket): A connected stream socket
+        high_water (int): Flush automatically once this many bytes are queued
+    """
+
+    def __init__(self, sock, high_water=65536):
+        self.sock = sock
+        self.high_water = high_water
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= self.high_water:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.sock.sendall(self._buffer)
+            self._buffer.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.flush()
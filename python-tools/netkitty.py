@@ -4,6 +4,8 @@ import subprocess
 import sys
 import threading
 
+import netcore
+
 # global variables to store options
 listen = False
 command = False
@@ -12,6 +14,7 @@ execute = ""
 target = ""
 upload_destination = ""
 port = 0
+max_clients = 64
 
 
 def run_command(cmd):
@@ -31,42 +34,41 @@ def client_handler(client_socket):
     global execute
     global command
 
+    reader = netcore.BufferedReader(client_socket)
+
     # check if an upload destination is specified
     if len(upload_destination):
-        file_buffer = b""
-
-        while True:
-            data = client_socket.recv(1024)
-            if not data:
-                break
-            else:
-                file_buffer += data
-
+        # stream the upload straight to disk instead of holding it in memory
         try:
             with open(upload_destination, "wb") as file_descriptor:
-                file_descriptor.write(file_buffer)
-            client_socket.send(
+                for chunk in reader.iter_chunks():
+                    file_descriptor.write(chunk)
+            client_socket.sendall(
                 f"Successfully saved file to {upload_destination}".encode()
             )
         except OSError as e:
-            client_socket.send(
+            client_socket.sendall(
                 f"Failed to save file to {upload_destination} due to OS Error. Details: {e}".encode()
             )
 
     # check if a command is specified
     if len(execute):
         output = run_command(execute)
-        client_socket.send(output)
+        client_socket.sendall(output)
 
     # check if command mode is enabled
     if command:
+        writer = netcore.BufferedWriter(client_socket)
         while True:
-            client_socket.send(b"<netkitty#> ")
-            cmd_buffer = b""
-            while b"\n" not in cmd_buffer:
-                cmd_buffer += client_socket.recv(1024)
-            response = run_command(cmd_buffer.decode())
-            client_socket.send(response)
+            writer.write(b"<netkitty#> ")
+            writer.flush()
+            cmd_buffer = reader.readline()
+            if not cmd_buffer:
+                # client disconnected
+                break
+            writer.write(run_command(cmd_buffer.decode()))
+
+    client_socket.close()
 
 
 def server_loop():
@@ -78,12 +80,24 @@ def server_loop():
         target = "0.0.0.0"  # Listen on all available interfaces
 
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     server.bind((target, port))
-    server.listen(5)
+    server.listen(socket.SOMAXCONN)
+
+    limiter = netcore.ConnectionLimiter(max_clients)
+
+    def handle(client_socket):
+        try:
+            client_handler(client_socket)
+        except OSError:
+            client_socket.close()
+        finally:
+            limiter.release()
 
     while True:
+        limiter.acquire()
         client_socket, addr = server.accept()
-        client_thread = threading.Thread(target=client_handler, args=(client_socket,))
+        client_thread = threading.Thread(target=handle, args=(client_socket,), daemon=True)
         client_thread.start()
 
 
@@ -93,28 +107,25 @@ def client_sender(buffer):
 
     try:
         client.connect((target, port))
+        reader = netcore.BufferedReader(client)
 
         if len(buffer):
-            client.send(buffer.encode())
+            client.sendall(buffer.encode())
 
         while True:
-            recv_len = 1
-            response = b""
-
-            while recv_len:
-                data = client.recv(4096)
-                recv_len = len(data)
-                response += data
-                if recv_len < 4096:
-                    break
+            # wait for the server, then take everything it has sent so far
+            response = reader.read_available()
+            if not response:
+                break
 
-        print(response.decode(), end=" ")
-        buffer = input("") + "\n"
-        client.send(buffer.encode())
+            print(response.decode(errors="replace"), end=" ")
+            buffer = input("") + "\n"
+            client.sendall(buffer.encode())
 
-    except socket.error as e:
+    except (socket.error, EOFError) as e:
         print("[*] Exception caught. Exiting.")
         print(f"[*] Details of error: {e}")
+    finally:
         client.close()
 
 
@@ -126,6 +137,7 @@ def usage_info():
     print("-e --execute=file_to_run     - Execute a file upon receiving a connection")
     print("-c --command                 - Initialize a command shell")
     print("-u --upload=destination      - Upload a file and write it to [destination]")
+    print("-m --max-clients=count       - Clients served at once when listening (default 64)")
     print("Examples:")
     print("bhp_net.py -t 192.168.0.1 -p 555 -l -c")
     print("bhp_net.py -t 192.168.0.1 -p 555 -l -u=c:\\target.exe")
@@ -141,7 +153,8 @@ def main():
     global execute
     global command
     global upload_destination
-    global targer
+    global target
+    global max_clients
 
     if not len(sys.argv[1:]):
         usage_info()
@@ -149,8 +162,17 @@ def main():
     try:
         opts, args = getopt.getopt(
             sys.argv[1:],
-            "hle:t:p:cu:",
-            ["help", "listen", "execute=", "target=", "port=", "command", "upload="],
+            "hle:t:p:cu:m:",
+            [
+                "help",
+                "listen",
+                "execute=",
+                "target=",
+                "port=",
+                "command",
+                "upload=",
+                "max-clients=",
+            ],
         )
         for o, a in opts:
             if o in ("-h", "--help"):
@@ -167,6 +189,8 @@ def main():
                 target = a
             elif o in ("-p", "--port"):
                 port = int(a)
+            elif o in ("-m", "--max-clients"):
+                max_clients = int(a)
             else:
                 assert False, "Unhandled option"
 
@@ -12,16 +12,20 @@ Unauthorized port scanning may be illegal and against terms of service.
 import socket          # Core library for network connections (TCP/UDP)
 import sys             # System-specific parameters and functions
 import argparse        # For parsing command-line arguments
+import asyncio         # For checking many ports at the same time
 from datetime import datetime  # For tracking scan duration
 
+import netcore         # Shared event loop, limiters and metrics (./netcore)
 
-def scan_port(target_ip, port):
+
+def scan_port(target_ip, port, timeout=1):
     """
     Attempts to connect to a specific port on the target IP.
     
     Args:
         target_ip (str): The IP address to scan (e.g., '192.168.1.1')
         port (int): The port number to check (e.g., 80, 443, 22)
+        timeout (float): Seconds to wait before treating the port as filtered
     
     Returns:
         bool: True if port is open, False if closed or filtered
@@ -33,7 +37,7 @@ def scan_port(target_ip, port):
     
     # Set a timeout to avoid waiting too long for unresponsive ports
     # 1 second is usually enough for local networks
-    sock.settimeout(1)
+    sock.settimeout(timeout)
     
     try:
         # Attempt to connect to the target (IP, port)
@@ -59,6 +63,59 @@ def scan_port(target_ip, port):
         return False
 
 
+async def scan_port_async(target_ip, port, limiter, timeout=1):
+    """
+    Asynchronous version of scan_port() used by scan_ports().
+    
+    The event loop keeps hundreds of connection attempts in flight at once,
+    so filtered ports that never answer no longer cost a full timeout each.
+    
+    Args:
+        target_ip (str): The IP address to scan
+        port (int): The port number to check
+        limiter (netcore.ConnectionLimiter): Caps concurrent attempts
+        timeout (float): Seconds to wait before treating the port as filtered
+    
+    Returns:
+        bool: True if port is open, False if closed or filtered
+    """
+    async with limiter:
+        try:
+            # open_connection() completes the TCP handshake - success means open
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(target_ip, port), timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            # refused (closed), unreachable or no answer in time (filtered)
+            return False
+        writer.close()
+        return True
+
+
+async def scan_ports(target_ip, ports, concurrency=500, timeout=1, metrics=None):
+    """
+    Scans many ports concurrently.
+    
+    Args:
+        target_ip (str): The IP address to scan
+        ports (list): Port numbers to check
+        concurrency (int): Maximum connection attempts in flight
+        timeout (float): Seconds to wait for each port
+        metrics (netcore.MetricsRegistry): Optional registry for scan counters
+    
+    Returns:
+        list: The open ports, in ascending order
+    """
+    limiter = netcore.ConnectionLimiter(concurrency)
+    results = await asyncio.gather(
+        *(scan_port_async(target_ip, port, limiter, timeout) for port in ports)
+    )
+    if metrics is not None:
+        metrics.counter("ports_scanned").inc(len(ports))
+        metrics.counter("ports_open").inc(sum(results))
+    return sorted(port for port, is_open in zip(ports, results) if is_open)
+
+
 def get_service_name(port):
     """
     Attempts to get the common service name for a port number.
@@ -129,6 +186,20 @@ def main():
         help='Port range to scan (e.g., 80, 1-1000, 22,80,443). Default: 1-1024'
     )
     
+    # Optional tuning arguments for the concurrent scan
+    parser.add_argument(
+        '-c', '--concurrency',
+        type=int,
+        default=500,
+        help='Number of ports checked at the same time. Default: 500'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=1.0,
+        help='Seconds to wait for each port. Default: 1.0'
+    )
+    
     # Parse the command-line arguments
     # args is a namespace object containing all parsed arguments
     args = parser.parse_args()
@@ -171,29 +242,32 @@ def main():
     # Record the start time to calculate total scan duration
     start_time = datetime.now()
     
-    # Counter for open ports found
-    open_count = 0
-    
-    # Iterate through each port in our list
-    print("\nScanning...\n")
-    
+    # Validate port numbers (must be 1-65535)
+    # Port 0 is reserved, ports above 65535 don't exist in TCP/IPv4
+    valid_ports = []
     for port in ports_to_scan:
-        # Validate port number (must be 1-65535)
-        # Port 0 is reserved, ports above 65535 don't exist in TCP/IPv4
         if not (1 <= port <= 65535):
             print(f"Skipping invalid port: {port}")
             continue
-        
-        # Call our scan_port function to check if port is open
-        is_open = scan_port(target_ip, port)
-        
-        # If the port is open, display information about it
-        if is_open:
-            # Get the service name for this port (http, ssh, etc.)
-            service = get_service_name(port)
-            # Print formatted output: Port XXXX is OPEN (service)
-            print(f"[+] Port {port:5d} is OPEN   ({service})")
-            open_count += 1
+        valid_ports.append(port)
+    
+    print("\nScanning...\n")
+    
+    # Check all ports concurrently on the shared event loop
+    metrics = netcore.MetricsRegistry()
+    open_ports = netcore.run(
+        scan_ports(target_ip, valid_ports, args.concurrency, args.timeout, metrics)
+    )
+    if open_ports is None:
+        # Interrupted with Ctrl-C
+        sys.exit(1)
+    
+    for port in open_ports:
+        # Get the service name for this port (http, ssh, etc.)
+        service = get_service_name(port)
+        # Print formatted output: Port XXXX is OPEN (service)
+        print(f"[+] Port {port:5d} is OPEN   ({service})")
+    open_count = len(open_ports)
     
     # Calculate total scan time
     end_time = datetime.now()
@@ -204,6 +278,7 @@ def main():
     print(f"Scan complete!")
     print(f"Open ports found: {open_count}")
     print(f"Total scan time:  {duration}")
+    print(f"Ports per second: {metrics.rate('ports_scanned'):.0f}")
     print("-" * 50)
 
 
@@ -1,20 +1,426 @@
-import socket  # import socket module to enable network communication
+#!/usr/bin/env python3
+"""
+Banner Grabber - concurrent service fingerprinting for open TCP ports
 
-# define target server and port
-target_host = "127.0.0.1"  # IP address or website to connect to
-target_port = 80  # HTTP port for web traffic
+Reads (host, port) pairs, connects to each one and identifies the service
+behind it. Services that speak first (SSH, SMTP, FTP, ...) are read passively;
+otherwise a protocol-aware probe is sent (HTTP request, SMTP EHLO, SSH
+identification or a TLS ClientHello). Every endpoint gets a small byte and
+time budget and the response is matched against a precompiled signature table.
 
-# create a socket object using:
-# AF_INET -> IPv4
-# SOCK_STREAM -> TCP (Transmission Control Protocol)
-client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+Targets are read from the command line or from stdin, so the open ports found
+by portscanner.py can be piped straight in:
 
-# connect the client to the target server and port
-client.connect((target_host, target_port))
+    python3 portscanner.py -t 10.0.0.5 | python3 tcp-client.py -t 10.0.0.5
+    printf '10.0.0.5:22\\n10.0.0.6:443\\n' | python3 tcp-client.py
 
-# send an HTTP GET request to fetch the homepage
-client.send(b"GET /HTTP/1.1\r\nHost: " + target_host.encode() + b"\r\n\r\n")
+DISCLAIMER: Only use this tool on systems you own or have explicit permission to scan.
+"""
 
-# receive and print the response from the server
-response = client.recv(4096)
-print(response.decode)
+import argparse        # For parsing command-line arguments
+import asyncio         # For handling thousands of connections concurrently
+import ipaddress       # For deciding whether to send TLS SNI
+import json            # For machine-readable output
+import os              # For the ClientHello random bytes
+import re              # For the signature table
+import struct          # For building the TLS ClientHello
+import sys             # System-specific parameters and functions
+import threading       # For reading stdin off the event loop
+import time            # For per-endpoint time budgets
+
+import netcore         # Shared event loop runner and metrics (./netcore)
+
+
+def build_client_hello(server_name=None):
+    """
+    Builds a minimal TLS 1.2 ClientHello record.
+
+    Args:
+        server_name (str): Hostname to send as SNI, or None to omit it
+
+    Returns:
+        bytes: The complete TLS record
+    """
+    ciphers = [0xC02F, 0xC030, 0xC02B, 0xC02C, 0x009C, 0x009D, 0x002F, 0x0035, 0x00FF]
+    cipher_bytes = b"".join(struct.pack(">H", c) for c in ciphers)
+
+    extensions = b""
+    if server_name:
+        name = server_name.encode("idna")
+        entry = b"\x00" + struct.pack(">H", len(name)) + name
+        names = struct.pack(">H", len(entry)) + entry
+        extensions += struct.pack(">HH", 0x0000, len(names)) + names
+    # supported groups: secp256r1, secp384r1, x25519
+    extensions += struct.pack(">HHHHHH", 0x000A, 8, 6, 0x0017, 0x0018, 0x001D)
+    # ec point formats: uncompressed
+    extensions += struct.pack(">HHBB", 0x000B, 2, 1, 0)
+    # signature algorithms: rsa_pkcs1_sha256/384, rsa_pss_rsae_sha256, ecdsa_secp256r1_sha256
+    extensions += struct.pack(">HHHHHHH", 0x000D, 10, 8, 0x0401, 0x0501, 0x0804, 0x0403)
+
+    body = (b"\x03\x03" + os.urandom(32) + b"\x00"
+            + struct.pack(">H", len(cipher_bytes)) + cipher_bytes
+            + b"\x01\x00" + struct.pack(">H", len(extensions)) + extensions)
+    handshake = b"\x01" + len(body).to_bytes(3, "big") + body
+    return b"\x16\x03\x01" + struct.pack(">H", len(handshake)) + handshake
+
+
+# the SNI-less ClientHello is shared by every target given as an IP address
+CLIENT_HELLO = build_client_hello()
+
+PROBES = {
+    "http": b"GET / HTTP/1.1\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\nAccept: */*\r\nConnection: close\r\n\r\n",
+    "smtp": b"EHLO banner.local\r\n",
+    "ssh": b"SSH-2.0-OpenSSH_9.6\r\n",
+}
+
+# port -> (wait for the server to speak first, probe to send otherwise)
+PORT_PROBES = {
+    21: (True, None), 22: (True, "ssh"), 23: (True, None), 25: (True, "smtp"),
+    110: (True, None), 143: (True, None), 587: (True, "smtp"),
+    3306: (True, None), 5900: (True, None),
+    80: (False, "http"), 3000: (False, "http"), 5000: (False, "http"),
+    8000: (False, "http"), 8008: (False, "http"), 8080: (False, "http"),
+    8081: (False, "http"), 8888: (False, "http"), 9200: (False, "http"),
+    443: (False, "tls"), 465: (False, "tls"), 636: (False, "tls"),
+    853: (False, "tls"), 993: (False, "tls"), 995: (False, "tls"),
+    8443: (False, "tls"), 9443: (False, "tls"),
+}
+DEFAULT_PROBE = (True, "http")
+
+# (service, pattern that identifies it, pattern whose first group is the version)
+SIGNATURES = [
+    (name, re.compile(match, re.DOTALL), re.compile(version) if version else None)
+    for name, match, version in [
+        ("ssh", rb"^SSH-\d+\.\d+-", rb"^SSH-[\d.]+-([^\r\n]+)"),
+        ("http", rb"^HTTP/\d\.\d \d{3}", rb"\r\n[Ss]erver:[ \t]*([^\r\n]+)"),
+        ("tls", rb"^[\x15\x16]\x03[\x00-\x04]", None),
+        ("ftp", rb"^220[ -][^\r\n]*FTP", rb"^220[ -]([^\r\n]+)"),
+        ("smtp", rb"^220[ -][^\r\n]*SMTP", rb"^220[ -]([^\r\n]+)"),
+        ("pop3", rb"^\+OK", rb"^\+OK ([^\r\n]+)"),
+        ("imap", rb"^\* OK", rb"^\* OK ([^\r\n]+)"),
+        ("mysql", rb"^.{3}\x00\x0a[\d.]+", rb"^.{3}\x00\x0a([^\x00]+)"),
+        ("vnc", rb"^RFB \d{3}\.\d{3}", rb"^RFB (\d{3}\.\d{3})"),
+        ("redis", rb"^-(ERR|NOAUTH|DENIED)", None),
+        ("telnet", rb"^\xff[\xfb-\xfe]", None),
+        ("ftp/smtp", rb"^220[ -]", rb"^220[ -]([^\r\n]+)"),
+    ]
+]
+
+
+def identify(data):
+    """
+    Matches a response against the signature table.
+
+    Args:
+        data (bytes): Bytes received from the service
+
+    Returns:
+        tuple: (service, version) - service is None if nothing matched
+    """
+    for name, match, version in SIGNATURES:
+        if match.search(data):
+            found = version.search(data) if version else None
+            if found:
+                return name, found.group(1).decode("utf-8", "replace").strip()
+            return name, ""
+    return None, ""
+
+
+def printable(data, limit=80):
+    """Returns the first line of a banner with non-printable bytes escaped."""
+    line = data.split(b"\n", 1)[0].rstrip(b"\r")[:limit]
+    return "".join(chr(b) if 0x20 <= b < 0x7F else f"\\x{b:02x}" for b in line)
+
+
+def is_ip(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+async def read_budget(reader, buffer, max_bytes, deadline):
+    """Reads into buffer until a signature matches, the budget runs out or EOF."""
+    while len(buffer) < max_bytes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        try:
+            chunk = await asyncio.wait_for(reader.read(max_bytes - len(buffer)), remaining)
+        except asyncio.TimeoutError:
+            return
+        if not chunk:
+            return
+        buffer += chunk
+        service, version = identify(buffer)
+        if service and (version or service in ("tls", "telnet", "redis")):
+            return
+
+
+def new_result(host, port, state="open"):
+    """The result record grab() returns for one endpoint."""
+    return {"host": host, "port": port, "state": state, "service": None,
+            "version": "", "banner": ""}
+
+
+async def grab(host, port, connect_timeout=3.0, read_timeout=2.0, passive_timeout=0.6,
+               max_bytes=1024):
+    """
+    Connects to one endpoint and returns what it identifies as.
+
+    Returns:
+        dict: host, port, state ('open' or an error), service, version, banner
+    """
+    result = new_result(host, port)
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, limit=max_bytes), connect_timeout)
+    except asyncio.TimeoutError:
+        result["state"] = "timeout"
+        return result
+    except ConnectionRefusedError:
+        result["state"] = "closed"
+        return result
+    except OSError as e:
+        result["state"] = e.strerror or e.__class__.__name__
+        return result
+
+    buffer = bytearray()
+    try:
+        passive, probe = PORT_PROBES.get(port, DEFAULT_PROBE)
+
+        if passive:
+            await read_budget(reader, buffer, max_bytes, time.monotonic() + passive_timeout)
+
+        if not buffer and probe:
+            if probe == "tls":
+                payload = CLIENT_HELLO if is_ip(host) else build_client_hello(host)
+            else:
+                payload = PROBES[probe].replace(b"{host}", host.encode("idna"))
+            writer.write(payload)
+            await writer.drain()
+            await read_budget(reader, buffer, max_bytes, time.monotonic() + read_timeout)
+    except (OSError, UnicodeError):
+        # a reset mid-read, or a name the Host header cannot carry: keep
+        # whatever arrived before it
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    data = bytes(buffer)
+    result["service"], result["version"] = identify(data)
+    result["banner"] = printable(data) if result["service"] != "tls" else ""
+    return result
+
+
+PORTSCANNER_LINE = re.compile(r"Port\s+(\d+)\s+is OPEN")
+
+
+def parse_endpoint(line, default_host=None):
+    """
+    Parses 'host:port', 'host port' or a portscanner.py '[+] Port N is OPEN' line.
+
+    With a default_host only portscanner.py result lines and bare port numbers
+    are endpoints, so the rest of its output (e.g. 'Started at: ... 19:16:23')
+    is skipped rather than mistaken for a host:port pair.
+
+    Returns:
+        tuple: (host, port), or None for lines that carry no valid endpoint
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    if default_host:
+        found = PORTSCANNER_LINE.search(line)
+        port = found.group(1) if found else line
+        return (default_host, int(port)) if is_port(port) else None
+
+    host, sep, port = line.rpartition(":")
+    if not sep:
+        parts = line.split()
+        if len(parts) != 2:
+            return None
+        host, port = parts
+    host = host.strip("[]")
+    if not host or any(char.isspace() for char in host) or not is_port(port):
+        return None
+    return host, int(port)
+
+
+def is_port(text):
+    """True if text is a decimal port number in the range 1-65535."""
+    return text.isascii() and text.isdigit() and 1 <= int(text) <= 65535
+
+
+async def read_stdin_lines(backlog=1024):
+    """
+    Yields stdin lines without blocking the event loop.
+
+    The blocking reads happen in a daemon thread rather than the default
+    executor, so a run that stops early is not held up at exit by a read
+    waiting on a stdin that never ends.
+    """
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue()
+    slots = threading.Semaphore(backlog)
+
+    def reader():
+        try:
+            for line in sys.stdin:
+                # at most backlog lines wait in the queue at once
+                slots.acquire()
+                loop.call_soon_threadsafe(lines.put_nowait, line)
+            loop.call_soon_threadsafe(lines.put_nowait, None)
+        except RuntimeError:  # the run stopped early and the loop closed
+            pass
+
+    threading.Thread(target=reader, daemon=True).start()
+    while True:
+        line = await lines.get()
+        if line is None:
+            return
+        slots.release()
+        yield line
+
+
+async def run(endpoints, concurrency=200, on_result=print, **grab_kwargs):
+    """
+    Grabs banners for an (async) iterable of (host, port) pairs.
+
+    Only concurrency workers and a queue of twice that size are alive at any
+    time, so memory stays flat however many endpoints are streamed in. An
+    exception from on_result (e.g. BrokenPipeError once stdout is closed)
+    stops the run and is raised here.
+    """
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def worker():
+        while True:
+            endpoint = await queue.get()
+            if endpoint is None:
+                return
+            try:
+                result = await grab(*endpoint, **grab_kwargs)
+            except Exception as e:
+                # one bad endpoint (e.g. a name IDNA cannot encode) must not
+                # take the worker, and with it the whole run, down
+                result = new_result(*endpoint, state=str(e) or e.__class__.__name__)
+            on_result(result)
+
+    async def producer():
+        if hasattr(endpoints, "__aiter__"):
+            async for endpoint in endpoints:
+                await queue.put(endpoint)
+        else:
+            for endpoint in endpoints:
+                await queue.put(endpoint)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    # the producer would block on a full queue forever once the workers are
+    # gone, so the first task to fail cancels all the others
+    tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    tasks.append(asyncio.create_task(producer()))
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        errors = [task.exception() for task in done if task.exception()]
+        if errors:
+            raise errors[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def main():
+    """
+    Main function - entry point of the program.
+    Handles argument parsing and streams results as they complete.
+    """
+    parser = argparse.ArgumentParser(
+        description='Concurrent TCP banner grabber - Educational Tool',
+        epilog='Example: python3 portscanner.py -t 10.0.0.5 | python3 tcp-client.py -t 10.0.0.5'
+    )
+    parser.add_argument('endpoints', nargs='*',
+                        help='host:port pairs (read from stdin when omitted)')
+    parser.add_argument('-t', '--target',
+                        help='host for bare ports and portscanner.py output lines; '
+                             'other lines are ignored when set')
+    parser.add_argument('-c', '--concurrency', type=int, default=200,
+                        help='connections in flight at once. Default: 200')
+    parser.add_argument('--connect-timeout', type=float, default=3.0,
+                        help='seconds allowed to connect. Default: 3.0')
+    parser.add_argument('--read-timeout', type=float, default=2.0,
+                        help='seconds allowed to read after a probe. Default: 2.0')
+    parser.add_argument('--passive-timeout', type=float, default=0.6,
+                        help='seconds to wait for a server-first banner. Default: 0.6')
+    parser.add_argument('--max-bytes', type=int, default=1024,
+                        help='bytes read per endpoint. Default: 1024')
+    parser.add_argument('--json', action='store_true',
+                        help='print one JSON object per endpoint')
+    args = parser.parse_args()
+
+    metrics = netcore.MetricsRegistry()
+
+    def show(result):
+        metrics.counter(result["state"] if result["state"] != "open" else
+                        result["service"] or "unknown").inc()
+        metrics.counter("endpoints").inc()
+        endpoint = f"{result['host']}:{result['port']}"
+        if args.json:
+            line = json.dumps(result)
+        elif result["state"] != "open":
+            line = f"[-] {endpoint:<22} {result['state']}"
+        else:
+            service = result["service"] or "unknown"
+            line = f"[+] {endpoint:<22} {service:<9} {result['version'] or result['banner']}"
+        try:
+            print(line, flush=True)
+        except BrokenPipeError:
+            # the reader went away (e.g. '| head'): point stdout at devnull
+            # so the interpreter's final flush does not fail too, and let
+            # the exception stop the run
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            raise
+
+    if args.endpoints:
+        endpoints = [parse_endpoint(e, args.target) for e in args.endpoints]
+        endpoints = [e for e in endpoints if e]
+    else:
+        async def from_stdin():
+            async for line in read_stdin_lines():
+                endpoint = parse_endpoint(line, args.target)
+                if endpoint:
+                    yield endpoint
+        endpoints = from_stdin()
+
+    netcore.raise_fd_limit()
+    try:
+        netcore.run(run(
+            endpoints,
+            concurrency=args.concurrency,
+            on_result=show,
+            connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout,
+            passive_timeout=args.passive_timeout,
+            max_bytes=args.max_bytes,
+        ))
+    except BrokenPipeError:
+        pass
+
+    # summary on stderr keeps stdout clean for piping
+    counts = metrics.snapshot()["counters"]
+    total = counts.pop("endpoints", 0)
+    print(f"[*] {total} endpoints in {metrics.elapsed():.1f}s "
+          f"({metrics.rate('endpoints'):.0f}/s): "
+          + ", ".join(f"{name}={count}" for name, count in sorted(counts.items())),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+TCP load generator for tcp-server.py (or any request/response TCP listener).
+
+Opens connections from many concurrent asyncio clients, sends a payload and
+waits for the reply. Reports connections/sec, requests/sec and p50/p99
+latency measured from the start of connect() to the first reply byte.
+
+Example:
+    python3 tcp-server.py -q &
+    python3 tcp-loadgen.py -t 127.0.0.1 -p 9999 -c 500 -n 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+import netcore
+
+
+async def client(host, port, payload, requests_per_conn, timeout, latencies, errors,
+                 outcomes, budget):
+    """Repeatedly connects and sends requests until the shared budget is spent."""
+    while budget[0] > 0:
+        budget[0] -= 1
+        start = time.perf_counter()
+        writer = None
+        answered = 0
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            for _ in range(requests_per_conn):
+                writer.write(payload)
+                await writer.drain()
+                reply = await asyncio.wait_for(reader.read(65536), timeout)
+                if not reply:
+                    raise ConnectionResetError("server closed the connection")
+                latencies.observe(time.perf_counter() - start)
+                answered += 1
+                start = time.perf_counter()
+            outcomes["completed"] += 1
+        except (OSError, asyncio.TimeoutError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            # the connection failed, but only after some of its requests
+            # were answered (e.g. a server without keep-alive)
+            if answered:
+                outcomes["partial"] += 1
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+async def run_load(host, port, connections=10000, concurrency=200, payload=b"ping",
+                   requests_per_conn=1, timeout=5.0):
+    """
+    Runs the load test and returns a results dict.
+
+    Connections are counted once each: completed (every request answered),
+    partial (failed after at least one answer) or failed (no answer at all).
+
+    Returns:
+        dict: attempted, connections (completed), partial, failed, requests,
+              errors (by exception name), elapsed, conn_per_sec, req_per_sec,
+              p50_ms, p99_ms, max_ms
+    """
+    latencies = netcore.Histogram()
+    errors = {}
+    outcomes = {"completed": 0, "partial": 0}
+    budget = [connections]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, payload, requests_per_conn, timeout, latencies, errors, outcomes,
+               budget)
+        for _ in range(min(concurrency, connections))
+    ))
+    elapsed = time.perf_counter() - start
+
+    latency = latencies.summary()
+    return {
+        "attempted": connections,
+        "connections": outcomes["completed"],
+        "partial": outcomes["partial"],
+        "failed": connections - outcomes["completed"] - outcomes["partial"],
+        "requests": latency["count"],
+        "errors": errors,
+        "elapsed": elapsed,
+        "conn_per_sec": outcomes["completed"] / elapsed if elapsed else 0.0,
+        "req_per_sec": latency["count"] / elapsed if elapsed else 0.0,
+        "p50_ms": latency["p50"] * 1000,
+        "p99_ms": latency["p99"] * 1000,
+        "max_ms": latency["max"] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TCP connection/latency load generator")
+    parser.add_argument("-t", "--target", default="127.0.0.1", help="server address")
+    parser.add_argument("-p", "--port", type=int, default=9999, help="server port")
+    parser.add_argument("-n", "--connections", type=int, default=10000,
+                        help="total connections to open (default: 10000)")
+    parser.add_argument("-c", "--concurrency", type=int, default=200,
+                        help="clients running at once (default: 200)")
+    parser.add_argument("-r", "--requests", type=int, default=1,
+                        help="requests per connection, needs --keep-alive on the server")
+    parser.add_argument("--payload", default="ping", help="bytes sent per request")
+    parser.add_argument("--timeout", type=float, default=5.0,
+                        help="seconds allowed per connect/reply (default: 5)")
+    args = parser.parse_args()
+
+    netcore.raise_fd_limit()
+    results = netcore.run(run_load(
+        args.target,
+        args.port,
+        connections=args.connections,
+        concurrency=args.concurrency,
+        payload=args.payload.encode(),
+        requests_per_conn=args.requests,
+        timeout=args.timeout,
+    ))
+    if results is None:
+        return
+
+    print("-" * 50)
+    print(f"Connections:  {results['connections']} of {results['attempted']} completed "
+          f"in {results['elapsed']:.2f}s")
+    if results["partial"]:
+        print(f"Partial:      {results['partial']} failed after some requests")
+    if results["failed"]:
+        print(f"Failed:       {results['failed']} before any reply")
+    print(f"Conn/sec:     {results['conn_per_sec']:.0f}")
+    print(f"Requests/sec: {results['req_per_sec']:.0f}")
+    print(f"Latency p50:  {results['p50_ms']:.2f} ms")
+    print(f"Latency p99:  {results['p99_ms']:.2f} ms")
+    print(f"Latency max:  {results['max_ms']:.2f} ms")
+    if results["errors"]:
+        print(f"Errors:       {results['errors']}")
+    print("-" * 50)
+
+    if args.requests > 1 and results["attempted"] and \
+            results["errors"].get("ConnectionResetError", 0) == results["attempted"]:
+        print(f"[-] Every connection was closed before its {args.requests} requests were "
+              "answered; start tcp-server.py with --keep-alive or use -r 1")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
+import argparse
+import selectors
 import socket
 import sys
 import threading
 
+import netcore
+
 
 def hexdump(src, length=16):
     """Hex dump
@@ -13,7 +17,8 @@ def hexdump(src, length=16):
     result = []
     digits = 4  # offset width
 
-    if isinstance(src, bytes):  # ensure we handle bytes properly
+    if isinstance(src, (bytes, bytearray, memoryview)):  # ensure we handle bytes properly
+        src = bytes(src)
         for i in range(0, len(src), length):
             s = src[i : i + length]
             hexa = " ".join(f"{x:02X}" for x in s)  # hex representation
@@ -25,23 +30,12 @@ def hexdump(src, length=16):
     print("\n".join(result))
 
 
-def receive_from(connection):
+def receive_from(connection, timeout=2):
     """Receive data from the socket.
-    Reads data until no more is available or a timeout occurs.
+    Waits up to timeout for the first bytes, then returns everything that is
+    already queued instead of waiting for the timeout to expire.
     """
-    buffer = b""
-    connection.settimeout(2)
-
-    try:
-        while True:
-            data = connection.recv(4096)
-            if not data:
-                break
-            buffer += data
-    except socket.timeout:
-        pass
-
-    return buffer
+    return netcore.BufferedReader(connection).read_available(timeout)
 
 
 def request_handler(buffer):
@@ -54,17 +48,23 @@ def response_handler(buffer):
     return buffer
 
 
-def proxy_handler(client_socket, remote_host, remote_port, receive_first):
-    """Handles communication between the client and the remote host."""
+def proxy_handler(client_socket, remote_host, remote_port, receive_first, verbose=True,
+                  metrics=None):
+    """Handles communication between the client and the remote host.
+
+    Both directions are relayed as soon as data arrives on either socket, so
+    the proxy adds no fixed delay per exchange.
+    """
+    if metrics is None:
+        metrics = netcore.MetricsRegistry()
 
     # create a connection to the remote host
-    remote_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    remote_socket.connect((remote_host, remote_port))
+    remote_socket = socket.create_connection((remote_host, remote_port))
 
     # if we need to receive data first from the remote host
     if receive_first:
         remote_buffer = receive_from(remote_socket)
-        if remote_buffer:
+        if remote_buffer and verbose:
             print("[<==] Received from remote:")
             hexdump(remote_buffer)
 
@@ -72,47 +72,67 @@ def proxy_handler(client_socket, remote_host, remote_port, receive_first):
         remote_buffer = response_handler(remote_buffer)
 
         # forward modified response to local client
-        client_socket.send(remote_buffer)
-
-    while True:
-        # receive data from local client
-        local_buffer = receive_from(client_socket)
-        if local_buffer:
-            print(f"[==>] Received {len(local_buffer)} bytes from local host")
-            hexdump(local_buffer)
-
-            # modify the request if needed
-            local_buffer = request_handler(local_buffer)
-
-            # forward the request to the remote server
-            remote_socket.send(local_buffer)
-            print("[==>] Sent to remote")
-
-        # receive resposne from the remote server
-        remote_buffer = receive_from(remote_socket)
         if remote_buffer:
-            print(f"[<==] Received {len(remote_buffer)} bytes from remote")
-            hexdump(remote_buffer)
-
-            # modify the request if needed
-            remote_buffer = response_handler(remote_buffer)
-
-            # forward the response to the local client
-            client_socket.send(remote_buffer)
-            print("[<==] Sent to localhost")
-
-        # close connections when no more data is received
-        if not local_buffer or not remote_buffer:
-            client_socket.close()
-            remote_socket.close()
-            print("[*] No more data. Closing connections.")
-            break
+            client_socket.sendall(remote_buffer)
+            metrics.counter("bytes_from_remote").inc(len(remote_buffer))
 
+    readers = {
+        client_socket: netcore.BufferedReader(client_socket),
+        remote_socket: netcore.BufferedReader(remote_socket),
+    }
+    selector = selectors.DefaultSelector()
+    selector.register(client_socket, selectors.EVENT_READ)
+    selector.register(remote_socket, selectors.EVENT_READ)
 
-def server_loop(local_host, local_port, remote_host, remote_port, receive_first):
+    try:
+        while True:
+            for key, _ in selector.select():
+                sock = key.fileobj
+                data = readers[sock].recv_chunk()
+
+                # close connections when either side is done
+                if not data:
+                    if verbose:
+                        print("[*] No more data. Closing connections.")
+                    return
+
+                if sock is client_socket:
+                    if verbose:
+                        print(f"[==>] Received {len(data)} bytes from local host")
+                        hexdump(data)
+
+                    # modify the request if needed, then forward it
+                    data = request_handler(bytes(data))
+                    remote_socket.sendall(data)
+                    metrics.counter("bytes_from_local").inc(len(data))
+                    if verbose:
+                        print("[==>] Sent to remote")
+                else:
+                    if verbose:
+                        print(f"[<==] Received {len(data)} bytes from remote")
+                        hexdump(data)
+
+                    # modify the response if needed, then forward it
+                    data = response_handler(bytes(data))
+                    client_socket.sendall(data)
+                    metrics.counter("bytes_from_remote").inc(len(data))
+                    if verbose:
+                        print("[<==] Sent to localhost")
+    except OSError as e:
+        if verbose:
+            print(f"[-] Connection error: {e}")
+    finally:
+        selector.close()
+        client_socket.close()
+        remote_socket.close()
+
+
+def server_loop(local_host, local_port, remote_host, remote_port, receive_first,
+                verbose=True, max_clients=256):
     """Creates a listening server that forwards traffic to a remote server"""
 
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
     try:
         server.bind((local_host, local_port))
@@ -124,45 +144,67 @@ def server_loop(local_host, local_port, remote_host, remote_port, receive_first)
 
     print(f"[*] Listening on {local_host}:{local_port}")
 
-    server.listen(5)
+    server.listen(socket.SOMAXCONN)
+    limiter = netcore.ConnectionLimiter(max_clients)
+    metrics = netcore.MetricsRegistry()
 
-    while True:
-        client_socket, addr = server.accept()
-        print(f"[==>] Incoming connection from {addr[0]}:{addr[1]}")
+    def handle(client_socket):
+        try:
+            proxy_handler(client_socket, remote_host, remote_port, receive_first,
+                          verbose, metrics)
+        except OSError as e:
+            print(f"[-] Could not reach {remote_host}:{remote_port}: {e}")
+            client_socket.close()
+        finally:
+            limiter.release()
 
-        # create a new thread to handle the connection
-        proxy_thread = threading.Thread(
-            target=proxy_handler,
-            args=(client_socket, remote_host, remote_port, receive_first),
-        )
-        proxy_thread = threading.Thread(
-            target=proxy_handler,
-            args=(client_socket, remote_host, remote_port, receive_first),
-        )
-        proxy_thread.start()
+    connections = metrics.counter("connections")
+    try:
+        while True:
+            # wait for a free slot before accepting more clients
+            limiter.acquire()
+            client_socket, addr = server.accept()
+            connections.inc()
+            if verbose:
+                print(f"[==>] Incoming connection from {addr[0]}:{addr[1]}")
+
+            # create a new thread to handle the connection
+            proxy_thread = threading.Thread(target=handle, args=(client_socket,), daemon=True)
+            proxy_thread.start()
+    finally:
+        server.close()
+        counters = metrics.snapshot()["counters"]
+        print(f"\n[*] Proxied {counters.get('connections', 0)} connections in "
+              f"{metrics.elapsed():.1f}s: {counters.get('bytes_from_local', 0)} bytes "
+              f"to remote, {counters.get('bytes_from_remote', 0)} bytes to local")
 
 
 def main():
     """Main function to parse arguments and start the proxy server."""
 
-    if len(sys.argv[1:]) != 5:
-        print(
-            "Usage: ./tcp-proxy.py [localhost] [localport] [remotehost] [remoteport] [receive_first]"
-        )
-        print("Example: ./tcp-proxy.py 127.0.0.1 9000 10.12.132.1 9000 True")
-        sys.exit(1)
-
-    # assign command-line arguments
-    local_host = sys.argv[1]
-    local_port = int(sys.argv[2])
-    remote_host = sys.argv[3]
-    remote_port = int(sys.argv[4])
-
+    parser = argparse.ArgumentParser(
+        description="TCP proxy with hexdump of the relayed traffic",
+        epilog="Example: ./tcp-proxy.py 127.0.0.1 9000 10.12.132.1 9000 True",
+    )
+    parser.add_argument("localhost", help="address to listen on")
+    parser.add_argument("localport", type=int, help="port to listen on")
+    parser.add_argument("remotehost", help="host to forward traffic to")
+    parser.add_argument("remoteport", type=int, help="port to forward traffic to")
     # convert string "True" or "False" to boolean
-    receive_first = sys.argv[5].lower() == "true"
+    parser.add_argument("receive_first", type=lambda s: s.lower() == "true",
+                        help="True to read from the remote host before the client speaks")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not hexdump the relayed traffic")
+    parser.add_argument("--max-clients", type=int, default=256,
+                        help="connections proxied at once (default: 256)")
+    args = parser.parse_args()
 
     # start the server loop
-    server_loop(local_host, local_port, remote_host, remote_port, receive_first)
+    try:
+        server_loop(args.localhost, args.localport, args.remotehost, args.remoteport,
+                    args.receive_first, not args.quiet, args.max_clients)
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
@@ -1,43 +1,150 @@
-import socket
-import threading
+#!/usr/bin/env python3
+"""
+Asyncio TCP listener - a callback listener that holds up under bursts.
 
-# bind IP and port
-bind_ip = "0.0.0.0"  # listen on all available interfaces
-bind_port = 9999  # port to listen on
+Accepts connections on a single event loop instead of a thread per client,
+logs whatever each client sends and answers with a configurable response.
+Logging goes through a queue so that slow terminals or files never stall
+the event loop.
 
-# create TCP server socket
-server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+Example:
+    python3 tcp-server.py -b 0.0.0.0 -p 9999 --response "ACK!"
 
-# bind the server to the IP and port
-server.bind((bind_ip, bind_port))
+Use tcp-loadgen.py to measure connections/sec and latency against it.
+"""
 
-# start listening with a backlog of 5 connections
-server.listen(5)
+import argparse
+import asyncio
+import logging
+import logging.handlers
+import queue
 
-print(f"[*] Listening on {bind_ip}:{bind_port}")
+import netcore
 
-# client handling thread
+log = logging.getLogger("tcp-server")
 
 
-def handle_client(client_socket):
-    """Handles communication with the connected client."""
-    request = client_socket.recv(1024)  # receive data from the client
+def setup_logging(log_file=None):
+    """Routes log records through a queue drained by a background thread."""
+    handler = logging.FileHandler(log_file) if log_file else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("[*] %(message)s"))
 
-    print(f"[*] Received: {request.decode('utf-8')}")
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, handler)
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener.start()
+    return listener
 
-    # send back an acknowledgement
-    client_socket.send(b"ACK!")
 
-    print(f"[*] Sent ACK to {client_socket.getpeername()}")
+def make_handler(response=b"ACK!", keep_alive=False, max_bytes=65536,
+                 read_timeout=30.0, log_data=True, metrics=None):
+    """Builds the per-connection coroutine used by asyncio.start_server."""
+    if metrics is None:
+        metrics = netcore.MetricsRegistry()
+    connections = metrics.counter("connections")
+    bytes_in = metrics.counter("bytes_in")
 
-    client_socket.close()
+    async def handle_client(reader, writer):
+        connections.inc()
+        try:
+            # None when the client reset the connection before this ran
+            peer = writer.get_extra_info("peername")
+            if log_data:
+                log.info("Accepted connection from %s",
+                         f"{peer[0]}:{peer[1]}" if peer else "an unknown peer")
+            while True:
+                request = await asyncio.wait_for(reader.read(max_bytes), read_timeout)
+                if not request:
+                    break
+                bytes_in.inc(len(request))
+                if log_data:
+                    log.info("Received: %s", request.decode("utf-8", "replace"))
 
+                # send back an acknowledgement
+                writer.write(response)
+                await writer.drain()
 
-# main loop to accept incoming connections
-while True:
-    client, addr = server.accept()
-    print(f"[*] Accepted connection from {addr[0]}:{addr[1]}")
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
 
-    # spin up a new thread to handle the client
-    client_handler = threading.Thread(target=handle_client, args=(client,))
-    client_handler.start()
+    return handle_client
+
+
+async def serve(bind_ip="0.0.0.0", bind_port=9999, backlog=4096, ready=None, **handler_kwargs):
+    """Runs the listener until cancelled.
+
+    ready, if given, is an asyncio.Event set once the socket is listening.
+    """
+    server = await asyncio.start_server(
+        make_handler(**handler_kwargs),
+        bind_ip,
+        bind_port,
+        backlog=backlog,
+        reuse_address=True,
+    )
+    addrs = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+    log.info("Listening on %s (backlog %d)", addrs, backlog)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio TCP callback listener")
+    parser.add_argument("-b", "--bind", default="0.0.0.0",
+                        help="address to listen on (default: 0.0.0.0)")
+    parser.add_argument("-p", "--port", type=int, default=9999,
+                        help="port to listen on (default: 9999)")
+    parser.add_argument("--backlog", type=int, default=4096,
+                        help="listen backlog, capped by net.core.somaxconn (default: 4096)")
+    parser.add_argument("--response", default="ACK!",
+                        help="bytes sent back for each request (default: ACK!)")
+    parser.add_argument("--keep-alive", action="store_true",
+                        help="answer every request on a connection instead of closing after one")
+    parser.add_argument("--max-bytes", type=int, default=65536,
+                        help="largest single read per request (default: 65536)")
+    parser.add_argument("--read-timeout", type=float, default=30.0,
+                        help="seconds an idle client is kept (default: 30)")
+    parser.add_argument("--log-file", help="write the log here instead of stderr")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not log connections and received data")
+    args = parser.parse_args()
+
+    listener = setup_logging(args.log_file)
+    limit = netcore.raise_fd_limit()
+    if limit is not None:
+        log.info("Open file limit: %d", limit)
+
+    metrics = netcore.MetricsRegistry()
+    try:
+        netcore.run(serve(
+            args.bind,
+            args.port,
+            backlog=args.backlog,
+            response=args.response.encode(),
+            keep_alive=args.keep_alive,
+            max_bytes=args.max_bytes,
+            read_timeout=args.read_timeout,
+            log_data=not args.quiet,
+            metrics=metrics,
+        ))
+    finally:
+        counters = metrics.snapshot()["counters"]
+        log.info("Served %d connections, %d bytes received",
+                 counters.get("connections", 0), counters.get("bytes_in", 0))
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
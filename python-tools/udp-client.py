@@ -1,23 +1,406 @@
-import socket
+#!/usr/bin/env python3
+"""
+UDP Scanner - concurrent UDP port scanning built on the basic UDP client
 
-# define the target host and port
-target_host = "127.0.0.1"  # Localhost (own machine)
-target_port = 80  # port number
+UDP has no handshake, so a port can only be judged by what comes back after a
+datagram is sent to it:
 
-# create a socket object
-# AF_INET specifies IPv4 addressing, and SOCK_DGRAM specifies UDP
-client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    reply datagram                 -> open
+    ICMP port unreachable          -> closed
+    other ICMP unreachable codes   -> filtered
+    nothing (after all retries)    -> open|filtered
 
-# send data to the server
-# the sendTo() method sends the message "AAABBBCCC" to the specified (host, port)
-client.sendto(b"AAABBBCCC", (target_host, target_port))
+Instead of one blocking socket per port, a handful of non-blocking sockets
+send protocol-specific probes (DNS, SNMP, NTP, ...) to every host/port pair
+and a selector matches replies and ICMP errors as they arrive. Lost probes are
+retransmitted and the send rate is capped.
 
-# receive data from the server
-# the recvfrom() method reads up to 4096 bytes of data and also returns the sender's address
-data, addr = client.recvfrom(4096)
+Most hosts rate limit the ICMP errors that mark a port closed (Linux sends a
+burst of about 6, then roughly one per second), so at the default --rate only
+the first few closed ports of a real host report as closed and the rest as
+open|filtered. To tell closed ports apart on such a host, scan with a low
+rate, e.g. --rate 1, or re-scan just the open|filtered ports that way.
+Loopback and most LAN gear are not limited and scan at full speed.
 
-# close the socket
-client.close()
+ICMP errors are read from the socket error queue (IP_RECVERR), which is only
+available on Linux. On other platforms closed ports report as open|filtered.
 
-# print the received data
-print(data)
+DISCLAIMER: Only use this tool on systems you own or have explicit permission to scan.
+Unauthorized port scanning may be illegal and against terms of service.
+"""
+
+import argparse        # For parsing command-line arguments
+import ipaddress       # For expanding CIDR target ranges
+import selectors       # For waiting on many sockets at once
+import socket          # Core library for network connections (TCP/UDP)
+import struct          # For decoding the kernel's extended error records
+import sys             # System-specific parameters and functions
+import time            # For timeouts, retransmission and rate limiting
+from collections import deque
+from datetime import datetime  # For tracking scan duration
+
+import netcore         # Shared rate limiter and metrics (./netcore)
+
+# IP_RECVERR asks the kernel to queue ICMP errors on unconnected UDP sockets.
+# Older Python versions do not export the constant, so fall back to the
+# Linux value (11) when running on Linux.
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11 if sys.platform.startswith("linux") else None)
+# recvmsg() flag for reading that queue; missing where there is no queue
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", None)
+
+# struct sock_extended_err from <linux/errqueue.h>
+SO_EE_ORIGIN_ICMP = 2
+EXTENDED_ERR = struct.Struct("=IBBBB")
+ICMP_DEST_UNREACH = 3
+ICMP_PORT_UNREACH = 3
+
+OPEN = "open"
+CLOSED = "closed"
+FILTERED = "filtered"
+OPEN_FILTERED = "open|filtered"
+
+# Protocol-specific probes. Most UDP services silently drop datagrams they
+# cannot parse, so an empty or junk payload would make them look filtered.
+PAYLOADS = {
+    # DNS: CHAOS TXT query for version.bind
+    53: (b"\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00"
+         b"\x07version\x04bind\x00\x00\x10\x00\x03"),
+    # TFTP: read request for a file that should not exist
+    69: b"\x00\x01r7tftp.txt\x00octet\x00",
+    # ONC RPC: portmapper NULL call
+    111: struct.pack(">10I", 0x72FE1AF9, 0, 2, 100000, 2, 0, 0, 0, 0, 0),
+    # NTP: version 3 client request
+    123: b"\x1b" + b"\x00" * 47,
+    # NetBIOS: node status request for the wildcard name
+    137: (b"\x80\xf0\x00\x10\x00\x01\x00\x00\x00\x00\x00\x00"
+          b"\x20CKAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\x00\x00\x21\x00\x01"),
+    # SNMP: v1 get-request for sysDescr.0 with community "public"
+    161: (b"\x30\x29\x02\x01\x00\x04\x06public\xa0\x1c\x02\x04\x71\x64\xfe\xf1"
+          b"\x02\x01\x00\x02\x01\x00\x30\x0e\x30\x0c\x06\x08\x2b\x06\x01\x02"
+          b"\x01\x01\x01\x00\x05\x00"),
+    # SSDP: discovery request
+    1900: (b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\n"
+           b"MAN: \"ssdp:discover\"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n"),
+    # mDNS: DNS-SD service enumeration
+    5353: (b"\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00"
+           b"\x09_services\x07_dns-sd\x04_udp\x05local\x00\x00\x0c\x00\x01"),
+    # memcached: stats over the UDP frame header
+    11211: b"\x00\x01\x00\x00\x00\x01\x00\x00stats\r\n",
+}
+
+
+class UDPScanner:
+    """
+    Sends UDP probes to every (host, port) pair and classifies the replies.
+
+    Args:
+        targets (list): IPv4 addresses to scan
+        ports (list): Port numbers to scan on every target
+        sockets (int): Number of non-blocking sockets to spread probes over
+        retries (int): Retransmissions before a silent port is open|filtered
+        timeout (float): Seconds to wait for an answer to each probe
+        rate (float): Maximum probes sent per second
+    """
+
+    def __init__(self, targets, ports, sockets=4, retries=2, timeout=1.0, rate=1000):
+        self.targets = targets
+        self.ports = ports
+        self.num_sockets = sockets
+        self.retries = retries
+        self.timeout = timeout
+        self.rate = rate
+
+        # results[(ip, port)] = state, replies[(ip, port)] = first reply bytes;
+        # only pairs in probed are recorded, so stray datagrams from other
+        # addresses (e.g. a TFTP server answering from a new port) are ignored
+        self.probed = set()
+        self.results = {}
+        self.replies = {}
+        self.metrics = netcore.MetricsRegistry()
+
+    def _open_sockets(self):
+        """Creates the non-blocking sockets and registers them with a selector."""
+        selector = selectors.DefaultSelector()
+        socks = []
+        for _ in range(self.num_sockets):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            if IP_RECVERR is not None:
+                sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+            selector.register(sock, selectors.EVENT_READ)
+            socks.append(sock)
+        return selector, socks
+
+    def _record(self, key, state):
+        """Stores the final state for a probe unless one was already found."""
+        if key in self.probed and key not in self.results:
+            self.results[key] = state
+
+    def _drain_errors(self, sock):
+        """Reads queued ICMP errors and marks the matching ports."""
+        if IP_RECVERR is None or MSG_ERRQUEUE is None:
+            return
+        while True:
+            try:
+                _, ancdata, _, addr = sock.recvmsg(512, 512, MSG_ERRQUEUE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            # addr is the original destination of the probe that bounced
+            key = (addr[0], addr[1])
+            for level, cmsg_type, data in ancdata:
+                if level != socket.IPPROTO_IP or cmsg_type != IP_RECVERR:
+                    continue
+                _, origin, icmp_type, icmp_code, _ = EXTENDED_ERR.unpack_from(data)
+                if origin != SO_EE_ORIGIN_ICMP or icmp_type != ICMP_DEST_UNREACH:
+                    continue
+                if icmp_code == ICMP_PORT_UNREACH:
+                    self._record(key, CLOSED)
+                else:
+                    self._record(key, FILTERED)
+
+    def _drain_replies(self, sock):
+        """Reads every datagram waiting on the socket and marks its port open."""
+        while True:
+            try:
+                data, addr = sock.recvfrom(4096)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # a pending ICMP error is reported once through recvfrom;
+                # the details are picked up from the error queue
+                self._drain_errors(sock)
+                continue
+
+            key = (addr[0], addr[1])
+            if key in self.probed and key not in self.results:
+                self.results[key] = OPEN
+                self.replies[key] = data[:64]
+
+    def scan(self):
+        """
+        Runs the scan until every probe is answered or out of retries.
+
+        Returns:
+            dict: Maps (ip, port) to one of open, closed, filtered, open|filtered
+        """
+        selector, socks = self._open_sockets()
+
+        # interleave hosts so that one target does not see a burst of probes
+        pending = deque((ip, port) for port in self.ports for ip in self.targets)
+        self.probed.update(pending)
+        total = len(self.probed)
+        tries = {}
+
+        # probes in send order; the timeout is constant, so the deque is also
+        # ordered by deadline and only the head ever needs checking
+        in_flight = deque()
+
+        limiter = netcore.RateLimiter(self.rate)
+        sent = self.metrics.counter("probes_sent")
+        retransmits = self.metrics.counter("retransmits")
+        next_sock = 0
+
+        try:
+            # stop as soon as every probed port has a state, even if some
+            # resolved probes are still waiting out their deadline in in_flight
+            while (pending or in_flight) and len(self.results) < total:
+                now = time.monotonic()
+
+                while pending:
+                    key = pending[0]
+                    if key in self.results:
+                        pending.popleft()
+                        continue
+                    if not limiter.try_acquire():
+                        break
+                    pending.popleft()
+                    sock = socks[next_sock]
+                    next_sock = (next_sock + 1) % len(socks)
+                    try:
+                        sock.sendto(PAYLOADS.get(key[1], b""), key)
+                    except (BlockingIOError, InterruptedError):
+                        # send buffer full: retry after the next select
+                        pending.appendleft(key)
+                        break
+                    except (ConnectionRefusedError, ConnectionResetError):
+                        # an ICMP error for an earlier probe was reported on
+                        # this send instead; the datagram was not sent
+                        self._drain_errors(sock)
+                        pending.appendleft(key)
+                        continue
+                    except OSError as err:
+                        print(f"Socket error on {key[0]}:{key[1]}: {err}", file=sys.stderr)
+                        self._record(key, FILTERED)
+                        continue
+                    sent.inc()
+                    tries[key] = tries.get(key, 0) + 1
+                    in_flight.append((now + self.timeout, key, tries[key]))
+
+                # expire probes whose deadline has passed
+                while in_flight and in_flight[0][0] <= now:
+                    _, key, attempt = in_flight.popleft()
+                    if key in self.results or attempt != tries[key]:
+                        continue
+                    if attempt <= self.retries:
+                        # retransmissions go ahead of untouched probes
+                        retransmits.inc()
+                        pending.appendleft(key)
+                    else:
+                        self._record(key, OPEN_FILTERED)
+
+                # sleep until a socket is readable, a probe expires or a
+                # send token becomes available
+                wait = self.timeout
+                if in_flight:
+                    wait = min(wait, in_flight[0][0] - now)
+                if pending:
+                    wait = min(wait, limiter.wait_time())
+                for selector_key, _ in selector.select(max(wait, 0)):
+                    self._drain_errors(selector_key.fileobj)
+                    self._drain_replies(selector_key.fileobj)
+        finally:
+            selector.close()
+            for sock in socks:
+                sock.close()
+
+        return self.results
+
+
+def parse_ports(spec):
+    """
+    Parses a port specification such as '53,123,1-1024'.
+
+    Args:
+        spec (str): Comma separated ports and ranges
+
+    Returns:
+        list: Valid port numbers in the order given
+    """
+    ports = []
+    for part in spec.split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = part.split('-')
+            ports.extend(range(int(start), int(end) + 1))
+        else:
+            ports.append(int(part))
+
+    valid = [port for port in ports if 1 <= port <= 65535]
+    for port in ports:
+        if not (1 <= port <= 65535):
+            print(f"Skipping invalid port: {port}")
+    return valid
+
+
+def parse_targets(spec):
+    """
+    Expands a target specification such as 'host1,10.0.0.0/30'.
+
+    Args:
+        spec (str): Comma separated hostnames, addresses and CIDR ranges
+
+    Returns:
+        list: IPv4 addresses, or None if a hostname could not be resolved
+    """
+    targets = []
+    for part in spec.split(','):
+        part = part.strip()
+        if '/' in part:
+            network = ipaddress.ip_network(part, strict=False)
+            hosts = list(network.hosts()) or [network.network_address]
+            targets.extend(str(host) for host in hosts)
+            continue
+        try:
+            targets.append(socket.gethostbyname(part))
+        except socket.gaierror:
+            print(f"Error: Could not resolve hostname '{part}'")
+            return None
+    return targets
+
+
+def main():
+    """
+    Main function - entry point of the program.
+    Handles argument parsing and prints the scan results.
+    """
+    parser = argparse.ArgumentParser(
+        description='Concurrent UDP Port Scanner - Educational Tool',
+        epilog='Example: python3 udp-client.py -t 192.168.1.1 -p 1-1000'
+    )
+    parser.add_argument(
+        '-t', '--target',
+        required=True,
+        help='Targets to scan: hostnames, IPs or CIDR ranges, comma separated'
+    )
+    parser.add_argument(
+        '-p', '--ports',
+        default=','.join(str(port) for port in sorted(PAYLOADS)),
+        help='Port range to scan (e.g., 53, 1-1000, 53,123,161). '
+             'Default: ports with a protocol-specific probe'
+    )
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Retransmissions per silent port. Default: 2')
+    parser.add_argument('--timeout', type=float, default=1.0,
+                        help='Seconds to wait for each probe. Default: 1.0')
+    parser.add_argument('--rate', type=float, default=1000,
+                        help='Maximum probes per second, 0 for no cap. Hosts that '
+                             'rate limit ICMP need about 1 to report closed ports. '
+                             'Default: 1000')
+    parser.add_argument('--sockets', type=int, default=4,
+                        help='Number of sockets to send from. Default: 4')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Also list closed ports')
+    args = parser.parse_args()
+    if args.sockets < 1:
+        parser.error('--sockets must be at least 1')
+
+    targets = parse_targets(args.target)
+    if not targets:
+        sys.exit(1)
+    ports = parse_ports(args.ports)
+
+    print("-" * 50)
+    print(f"Targets:      {args.target} ({len(targets)} hosts)")
+    print(f"Port Range:   {args.ports}")
+    print(f"Total Probes: {len(targets) * len(ports)}")
+    print(f"Started at:   {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("-" * 50)
+
+    start_time = datetime.now()
+    scanner = UDPScanner(targets, ports, sockets=args.sockets, retries=args.retries,
+                         timeout=args.timeout, rate=args.rate)
+    results = scanner.scan()
+    duration = datetime.now() - start_time
+
+    counts = {}
+    for ip in targets:
+        for port in ports:
+            state = results.get((ip, port), OPEN_FILTERED)
+            counts[state] = counts.get(state, 0) + 1
+            if state == CLOSED and not args.verbose:
+                continue
+            reply = scanner.replies.get((ip, port))
+            detail = f"  {reply!r}" if reply else ""
+            print(f"[+] {ip} {port:5d}/udp {state:<13}{detail}")
+
+    print("\n" + "-" * 50)
+    print("Scan complete!")
+    for state in (OPEN, OPEN_FILTERED, FILTERED, CLOSED):
+        print(f"{state + ':':<15} {counts.get(state, 0)}")
+    print(f"Probes sent:     {scanner.metrics.counter('probes_sent').value} "
+          f"({scanner.metrics.counter('retransmits').value} retransmitted)")
+    print(f"Total scan time: {duration}")
+    print("-" * 50)
+
+    # a few closed ports followed by silence is what ICMP rate limiting
+    # on the target looks like
+    if counts.get(CLOSED) and counts.get(OPEN_FILTERED) and not 0 < args.rate <= 1:
+        print("[*] Some ports answered closed and others not at all; if the target rate "
+              "limits ICMP, re-scan the open|filtered ports with --rate 1")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,16 +19,6 @@
 
 import os, time, datetime, sys, csv, argparse, struct, io, ipaddress
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-parser = argparse.ArgumentParser(description="utmp parser")
-parser.add_argument("input", help="specified input utmp file")
-parser.add_argument("-o", "--output", help="specified output file name")
-args = parser.parse_args()
-
-input_file = args.input
-output_file = args.output
-
 row = ["type", "pid", "line", "id", "user", "host", "term", "exit", "session", "sec", "usec", "addr"]
 
 def parseutmp(utmp_filesize, utmp_file, tsv):
@@ -73,6 +63,16 @@ def parseutmp(utmp_filesize, utmp_file, tsv):
   utmp_file.close()
 
 if __name__ == '__main__':
+  sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+  parser = argparse.ArgumentParser(description="utmp parser")
+  parser.add_argument("input", help="specified input utmp file")
+  parser.add_argument("-o", "--output", help="specified output file name")
+  args = parser.parse_args()
+
+  input_file = args.input
+  output_file = args.output
+
   if os.path.exists(input_file):
     with open(input_file, "rb") as utmp_file:
       utmp_filesize = os.path.getsize(input_file)